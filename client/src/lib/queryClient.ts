@@ -34,6 +34,28 @@ export async function apiRequest(
   return await res.json();
 }
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// Fetch one page of an array endpoint that is paginated with an
+// X-Next-Cursor header; the header is missing on the last page
+export async function fetchPage<T>(
+  url: string,
+  cursor: string | null,
+  pageSize = 20,
+): Promise<Page<T>> {
+  const params = new URLSearchParams({ limit: String(pageSize) });
+  if (cursor) params.set("cursor", cursor);
+  const res = await fetch(`${url}?${params}`, { credentials: "include" });
+  await throwIfResNotOk(res);
+  return {
+    items: (await res.json()) as T[],
+    nextCursor: res.headers.get("X-Next-Cursor"),
+  };
+}
+
 type UnauthorizedBehavior = "returnNull" | "throw";
 export const getQueryFn: <T>(options: {
   on401: UnauthorizedBehavior;
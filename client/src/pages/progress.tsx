@@ -1,7 +1,8 @@
 import { useEffect } from "react";
 import { useAuth } from "@/hooks/useAuth";
 import { useToast } from "@/hooks/use-toast";
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery } from "@tanstack/react-query";
+import { fetchPage } from "@/lib/queryClient";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
@@ -30,17 +31,45 @@ import {
   Line,
 } from "recharts";
 
+interface SubjectStats {
+  totalSessions: number;
+  totalQuestions: number;
+  correctAnswers: number;
+  accuracy: number;
+}
+
 export default function ProgressPage() {
   const { user, isAuthenticated } = useAuth();
   const { toast } = useToast();
 
-  const { data: allSessions = [], isLoading: sessionsLoading } = useQuery<
-    PracticeSession[]
-  >({
+  // Totals come from the stats endpoint, so the page never needs the
+  // whole session history
+  const { data: stats, isLoading: statsLoading } = useQuery<{
+    maths: SubjectStats;
+    english: SubjectStats;
+  }>({
+    queryKey: ["/api/students", user?.id, "stats"],
+    enabled: isAuthenticated && !!user?.id,
+  });
+
+  // History is fetched a page at a time, newest first
+  const {
+    data: sessionPages,
+    isLoading: sessionsLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useInfiniteQuery({
     queryKey: ["/api/practice-sessions/all"],
+    queryFn: ({ pageParam }) =>
+      fetchPage<PracticeSession>("/api/practice-sessions/all", pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
     enabled: isAuthenticated,
   });
 
+  const allSessions = sessionPages?.pages.flatMap((page) => page.items) ?? [];
+
   const { data: achievements = [], isLoading: achievementsLoading } = useQuery<
     UserAchievement[]
   >({
@@ -48,45 +77,30 @@ export default function ProgressPage() {
     enabled: isAuthenticated,
   });
 
-  const totalSessions = allSessions.length;
-  const totalQuestionsAttempted = allSessions.reduce(
-    (sum, session) => sum + (session.questionsAttempted || 0),
-    0
-  );
-  const totalQuestionsCorrect = allSessions.reduce(
-    (sum, session) => sum + (session.questionsCorrect || 0),
-    0
-  );
+  const mathsStats = stats?.maths;
+  const englishStats = stats?.english;
+
+  const totalSessions =
+    (mathsStats?.totalSessions || 0) + (englishStats?.totalSessions || 0);
+  const totalQuestionsAttempted =
+    (mathsStats?.totalQuestions || 0) + (englishStats?.totalQuestions || 0);
+  const totalQuestionsCorrect =
+    (mathsStats?.correctAnswers || 0) + (englishStats?.correctAnswers || 0);
   const overallAccuracy =
     totalQuestionsAttempted > 0
       ? Math.round((totalQuestionsCorrect / totalQuestionsAttempted) * 100)
       : 0;
 
-  const mathsSessions = allSessions.filter((s) => s.subject === "maths");
-  const englishSessions = allSessions.filter((s) => s.subject === "english");
-
   const subjectData = [
     {
       subject: "Maths",
-      sessions: mathsSessions.length,
-      accuracy: mathsSessions.length
-        ? Math.round(
-            (mathsSessions.reduce((sum, s) => sum + (s.questionsCorrect || 0), 0) /
-              mathsSessions.reduce((sum, s) => sum + (s.questionsAttempted || 0), 0)) *
-              100
-          )
-        : 0,
+      sessions: mathsStats?.totalSessions || 0,
+      accuracy: mathsStats?.accuracy || 0,
     },
     {
       subject: "English",
-      sessions: englishSessions.length,
-      accuracy: englishSessions.length
-        ? Math.round(
-            (englishSessions.reduce((sum, s) => sum + (s.questionsCorrect || 0), 0) /
-              englishSessions.reduce((sum, s) => sum + (s.questionsAttempted || 0), 0)) *
-              100
-          )
-        : 0,
+      sessions: englishStats?.totalSessions || 0,
+      accuracy: englishStats?.accuracy || 0,
     },
   ];
 
@@ -170,7 +184,7 @@ export default function ProgressPage() {
               <CardTitle>Subject Performance</CardTitle>
             </CardHeader>
             <CardContent>
-              {sessionsLoading ? (
+              {statsLoading ? (
                 <Skeleton className="h-64 w-full" />
               ) : subjectData.some((d) => d.sessions > 0) ? (
                 <ResponsiveContainer width="100%" height={250}>
@@ -344,6 +358,17 @@ export default function ProgressPage() {
                     </div>
                   </div>
                 ))}
+                {hasNextPage && (
+                  <Button
+                    variant="outline"
+                    className="w-full"
+                    onClick={() => fetchNextPage()}
+                    disabled={isFetchingNextPage}
+                    data-testid="button-load-more-sessions"
+                  >
+                    {isFetchingNextPage ? "Loading..." : "Load more"}
+                  </Button>
+                )}
               </div>
             )}
           </CardContent>
@@ -2,9 +2,23 @@
 Lambda function: Get user's achievements
 Equivalent to: GET /api/achievements/user
 """
-from shared import require_auth, execute_query, success_response, error_response
+from shared import instrument, require_auth, execute_query, success_response, error_response
+from shared.responses import compress_response
+from shared.conditional import conditional_get
+from shared.cache import get_or_load, resource_key
 
+# Achievements are only ever unlocked, so the count and latest unlock identify the list
+VERSION_QUERY = """
+    SELECT COUNT(*) || ':' || COALESCE(MAX("unlockedAt")::text, '') AS version,
+           MAX("unlockedAt") AS "lastModified"
+    FROM "userAchievements"
+    WHERE "userId" = %(user_id)s
+"""
+
+@instrument
+@compress_response
 @require_auth
+@conditional_get(VERSION_QUERY, resource='achievements')
 def lambda_handler(event, context, user):
     """
     Get all achievements unlocked by the authenticated user
@@ -24,9 +38,9 @@ def lambda_handler(event, context, user):
             ORDER BY ua."unlockedAt" DESC
         """
         
-        achievements = execute_query(query, (user_id,))
+        achievements = get_or_load(resource_key('achievements', user_id), lambda: execute_query(query, (user_id,)))
         
-        return success_response([dict(a) for a in achievements])
+        return success_response(achievements)
         
     except Exception as e:
         return error_response(str(e), 500)
@@ -2,9 +2,16 @@
 Lambda function: Get authenticated user profile
 Equivalent to: GET /api/auth/user
 """
-from shared import require_auth, execute_one, success_response, error_response
+from shared import instrument, require_auth, execute_one, success_response, error_response
+from shared.conditional import conditional_get
+from shared.cache import get_or_load, resource_key
 
+# xmin changes whenever the row is updated
+VERSION_QUERY = 'SELECT xmin::text AS version FROM users WHERE id = %(user_id)s'
+
+@instrument
 @require_auth
+@conditional_get(VERSION_QUERY, resource='profile')
 def lambda_handler(event, context, user):
     """
     Get authenticated user's profile information
@@ -27,7 +34,7 @@ def lambda_handler(event, context, user):
             WHERE id = %s
         """
         
-        user_data = execute_one(query, (user_id,))
+        user_data = get_or_load(resource_key('profile', user_id), lambda: execute_one(query, (user_id,)))
         
         if not user_data:
             return error_response("User not found", 404)
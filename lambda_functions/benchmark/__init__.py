@@ -0,0 +1,10 @@
+"""
+Local load-test and benchmark suite for the Lambda functions
+
+    benchmark.seed       seed a disposable Postgres with realistic volumes
+    benchmark.stubs      local JWKS (Auth0) and OpenAI stand-ins
+    benchmark.scenarios  how each handler is called
+    benchmark.run        drive the handlers concurrently and report percentiles
+
+See "Benchmarks" in the README.
+"""
@@ -0,0 +1,245 @@
+"""
+Drive every Lambda handler under load and report latency percentiles
+
+Starts the JWKS and OpenAI stubs, points the shared modules at them and
+at DATABASE_URL, then calls each handler's lambda_handler in-process from
+`--concurrency` threads. For every handler it reports throughput,
+p50/p95/p99 latency, status codes and the mean per-phase metrics
+(shared.metrics) of each call.
+
+Run from the lambda_functions directory against a database seeded by
+benchmark.seed:
+    python -m benchmark.run --concurrency 8 --requests 300
+    python -m benchmark.run --handlers pets.get_pet,questions.validate --openai-latency 1.5
+    python -m benchmark.run --json results.json --baseline main.json
+
+With --baseline, handlers whose p95 or throughput moved by more than
+--threshold percent are flagged and the exit status is 1.
+"""
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import argparse
+import importlib
+import threading
+from types import SimpleNamespace
+
+# Settings that must not leak in from the developer's shell: answers are
+# written directly, reads use the in-process cache and prefetching runs on
+# local threads
+FORCED_ENV = {
+    'ANSWER_EVENTS_QUEUE_URL': '',
+    'CACHE_URL': '',
+    'PREFETCH_FUNCTION_NAME': '',
+    'METRICS_SINK': 'off',
+}
+PHASE_COLUMNS = ['dbMs', 'queries', 'openaiMs']
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def configure(args, jwks, openai):
+    """Point the shared modules at the stubs; must run before they are imported"""
+    os.environ.update(jwks.env())
+    os.environ.update(openai.env())
+    os.environ.update(FORCED_ENV)
+    # Every worker thread may hold a connection, plus prefetch threads
+    os.environ['DB_POOL_MAX_SIZE'] = str(args.concurrency + 4)
+
+
+def run_scenario(scenario, fixtures, jwks, sink, requests, concurrency, duration=None, warmup=0):
+    """
+    Call one handler `requests` times (or for `duration` seconds) from `concurrency` threads
+
+    Returns:
+        dict: Latency percentiles in ms, throughput, status counts and mean phase metrics
+    """
+    handler = importlib.import_module(scenario.module).lambda_handler
+    function_name = scenario.module.replace('.', '-')
+
+    def call():
+        event, user_id = scenario.build(fixtures)
+        if user_id is not None:
+            event["headers"]["Authorization"] = f"Bearer {jwks.mint(user_id)}"
+        context = SimpleNamespace(function_name=function_name, aws_request_id=str(uuid.uuid4()))
+        start = time.perf_counter()
+        try:
+            response = handler(event, context)
+            status = response.get('statusCode', 200) if isinstance(response, dict) else 200
+        except Exception:
+            status = 'error'
+        return (time.perf_counter() - start) * 1000, status
+
+    for _ in range(warmup):
+        call()
+    sink.clear()
+
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    remaining = [requests]
+    deadline = time.monotonic() + duration if duration else None
+
+    def worker():
+        while True:
+            with lock:
+                if deadline is None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            ms, status = call()
+            with lock:
+                latencies.append(ms)
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    records = [r for r in sink.records if r.get('FunctionName') == function_name]
+    phases = {
+        column: round(sum(r.get(column, 0) for r in records) / len(records), 2) if records else None
+        for column in PHASE_COLUMNS
+    }
+    return {
+        "handler": scenario.module,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 3),
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50": round(percentile(latencies, 50), 2),
+        "p95": round(percentile(latencies, 95), 2),
+        "p99": round(percentile(latencies, 99), 2),
+        "max": round(latencies[-1], 2) if latencies else 0.0,
+        "statuses": statuses,
+        **phases,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Flag handlers whose p95 rose or throughput fell by more than `threshold` percent
+
+    Returns:
+        dict: handler -> list of regression descriptions
+    """
+    previous = {r['handler']: r for r in baseline.get('results', [])}
+    regressions = {}
+    for result in results:
+        before = previous.get(result['handler'])
+        if not before:
+            continue
+        problems = []
+        if before['p95'] and result['p95'] > before['p95'] * (1 + threshold / 100):
+            problems.append(f"p95 {before['p95']:.1f} -> {result['p95']:.1f} ms")
+        if before['throughput'] and result['throughput'] < before['throughput'] * (1 - threshold / 100):
+            problems.append(f"throughput {before['throughput']:.1f} -> {result['throughput']:.1f}/s")
+        if problems:
+            regressions[result['handler']] = problems
+    return regressions
+
+
+def format_table(results, regressions=None):
+    regressions = regressions or {}
+    header = (f"{'handler':<36} {'reqs':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+              f"{'db ms':>7} {'queries':>7} {'oai ms':>8}  statuses")
+    lines = [header, '-' * len(header)]
+
+    def cell(value, width):
+        return f"{'-':>{width}}" if value is None else f"{value:>{width}}"
+
+    for r in results:
+        statuses = ' '.join(f"{code}:{n}" for code, n in sorted(r['statuses'].items()))
+        flag = '  REGRESSION' if r['handler'] in regressions else ''
+        lines.append(
+            f"{r['handler']:<36} {r['requests']:>6} {r['throughput']:>8.1f} {r['p50']:>8.1f} "
+            f"{r['p95']:>8.1f} {r['p99']:>8.1f} {cell(r['dbMs'], 7)} {cell(r['queries'], 7)} "
+            f"{cell(r['openaiMs'], 8)}  {statuses}{flag}"
+        )
+    for handler, problems in regressions.items():
+        lines.append(f"REGRESSION {handler}: {'; '.join(problems)}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Lambda handlers in-process")
+    parser.add_argument('--handlers', help="comma-separated handler modules (default: all)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help="calls per handler")
+    parser.add_argument('--duration', type=float, help="seconds per handler instead of --requests")
+    parser.add_argument('--warmup', type=int, default=5, help="untimed calls per handler first")
+    parser.add_argument('--openai-latency', type=float, default=0.8, help="seconds")
+    parser.add_argument('--openai-jitter', type=float, default=0.2, help="seconds")
+    parser.add_argument('--openai-error-rate', type=float, default=0.0)
+    parser.add_argument('--json', dest='json_path', help="write results to this file")
+    parser.add_argument('--baseline', help="results file from an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=20.0, help="regression threshold, percent")
+    args = parser.parse_args(argv)
+
+    if not os.environ.get('DATABASE_URL'):
+        raise SystemExit("Set DATABASE_URL to a database seeded with python -m benchmark.seed")
+
+    from .stubs import JWKSStub, FakeOpenAI
+    jwks = JWKSStub().start()
+    openai = FakeOpenAI(args.openai_latency, args.openai_jitter, args.openai_error_rate).start()
+    configure(args, jwks, openai)
+
+    # Imported only now that the environment points at the stubs
+    from shared import metrics
+    from .scenarios import SCENARIOS, Fixtures
+    sink = metrics.MemorySink()
+    metrics.set_sink(sink)
+
+    scenarios = SCENARIOS
+    if args.handlers:
+        wanted = [name.strip() for name in args.handlers.split(',') if name.strip()]
+        unknown = set(wanted) - {s.module for s in SCENARIOS}
+        if unknown:
+            raise SystemExit(f"Unknown handlers: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in SCENARIOS if s.module in wanted]
+
+    fixtures = Fixtures()
+    results = []
+    for scenario in scenarios:
+        result = run_scenario(scenario, fixtures, jwks, sink, args.requests, args.concurrency,
+                              args.duration, args.warmup)
+        results.append(result)
+        print(f"{scenario.module}: {result['throughput']:.1f}/s p95 {result['p95']:.1f} ms", file=sys.stderr)
+
+    regressions = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+
+    print(format_table(results, regressions))
+    print(f"\nOpenAI stub: {openai.requests} requests, {openai.errors} injected failures; "
+          f"JWKS fetches: {jwks.fetches}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({
+                "settings": {key: value for key, value in vars(args).items()
+                             if key not in ('json_path', 'baseline')},
+                "results": results,
+            }, f, indent=2)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Benchmark scenarios: one per Lambda handler
+
+Each scenario names a handler module and builds the events it is driven
+with from Fixtures, a sample of the rows benchmark.seed created. Events
+cycle through many users so caches behave as they would under real
+traffic rather than serving one hot key.
+
+Scenarios that consume rows (completing open sessions, adopting a first
+pet) move on to error responses once their rows run out; the runner
+reports status codes, so that shows up as 4xx rather than as speed.
+"""
+import json
+import uuid
+import random
+import itertools
+import threading
+from shared.database import execute_query
+from shared.answer_events import answer_event
+
+# Rows of each kind sampled from the seeded database
+FIXTURE_SAMPLE = 2000
+
+
+class Fixtures:
+    """Ids sampled from a seeded database, handed out round-robin"""
+
+    def __init__(self, sample=FIXTURE_SAMPLE):
+        self.students = [r['id'] for r in execute_query(
+            """SELECT id FROM users WHERE role = 'student' AND id IN (SELECT "userId" FROM pets)
+               ORDER BY random() LIMIT %s""", (sample,))]
+        self.petless = [r['id'] for r in execute_query(
+            """SELECT id FROM users u WHERE role = 'student'
+               AND NOT EXISTS (SELECT 1 FROM pets p WHERE p."userId" = u.id) LIMIT %s""", (sample,))]
+        self.links = [(r['supervisorId'], r['studentId']) for r in execute_query(
+            """SELECT "supervisorId", "studentId" FROM "studentLinks" WHERE status = 'approved'
+               ORDER BY random() LIMIT %s""", (sample,))]
+        self.supervisors = sorted({supervisor for supervisor, _ in self.links})
+        open_sessions = execute_query(
+            """SELECT id, "userId", subject, "yearLevel" FROM "practiceSessions"
+               WHERE "completedAt" IS NULL ORDER BY random() LIMIT %s""", (2 * sample,))
+        # Half are only read and answered, half get completed
+        self.active_sessions = open_sessions[0::2]
+        self.closing_sessions = open_sessions[1::2]
+        if not (self.students and self.links and self.active_sessions):
+            raise SystemExit("No fixtures found; seed the database with python -m benchmark.seed first")
+
+        self._cycles = {}
+        self._lock = threading.Lock()
+
+    def next(self, name, cycle=True):
+        """
+        Return the next row of a fixture list
+
+        With cycle=False each row is handed out once and None is returned
+        after that.
+        """
+        with self._lock:
+            iterator = self._cycles.get(name)
+            if iterator is None:
+                rows = getattr(self, name)
+                iterator = itertools.cycle(rows) if cycle else iter(rows)
+                self._cycles[name] = iterator
+            return next(iterator, None)
+
+
+class Scenario:
+    """
+    How to call one handler
+
+    Args:
+        module: Handler module, e.g. 'pets.get_pet'
+        build: fixtures -> (event, user id or None); the runner adds an
+            Authorization header for the user
+    """
+
+    def __init__(self, module, build):
+        self.module = module
+        self.build = build
+
+
+def _http(method, user_id, body=None, path=None, query=None):
+    event = {
+        "httpMethod": method,
+        "headers": {"Accept-Encoding": "gzip"},
+        "pathParameters": path,
+        "queryStringParameters": query,
+    }
+    if body is not None:
+        event["body"] = json.dumps(body)
+    return event, user_id
+
+
+def _student(f):
+    return f.next('students')
+
+
+def _create_pet(f):
+    user_id = f.next('petless', cycle=False) or _student(f)
+    return _http('POST', user_id, {"name": "Bench", "type": random.choice(['cat', 'dog', 'owl'])})
+
+
+def _complete_session(f):
+    session = f.next('closing_sessions', cycle=False)
+    if session is None:
+        # All completed: measure the "already completed" path
+        session = f.next('active_sessions')
+    return _http('POST', session['userId'], path={"sessionId": session['id']})
+
+
+def _next_question(f):
+    session = f.next('active_sessions')
+    return _http('GET', session['userId'], path={"sessionId": session['id']})
+
+
+def _create_session(f):
+    return _http('POST', _student(f), {"subject": random.choice(['maths', 'english']),
+                                       "yearLevel": random.randint(1, 8)})
+
+
+def _generate(f):
+    return _http('POST', _student(f), {"subject": random.choice(['maths', 'english']),
+                                       "yearLevel": random.randint(1, 8),
+                                       "difficulty": random.choice(['easy', 'medium', 'hard'])})
+
+
+def _generate_batch(f):
+    event, user_id = _generate(f)
+    event["body"] = json.dumps(dict(json.loads(event["body"]), count=5))
+    return event, user_id
+
+
+def _validate(f):
+    session = f.next('active_sessions')
+    a, b = random.randint(2, 12), random.randint(2, 12)
+    # Mostly answers graded locally, some that need OpenAI
+    user_answer = random.choice([str(a * b), str(a * b), str(a * b + 1), f"it is {a * b}"])
+    return _http('POST', session['userId'], {
+        "sessionId": session['id'],
+        "questionId": str(uuid.uuid4()),
+        "question": f"What is {a} x {b}?",
+        "correctAnswer": str(a * b),
+        "userAnswer": user_answer,
+        "subject": session['subject'],
+        "type": "text",
+    })
+
+
+def _record_answers(f):
+    records = []
+    for _ in range(10):
+        session = f.next('active_sessions')
+        event = answer_event(session['id'], str(uuid.uuid4()), "What is 6 x 7?", "42",
+                             random.random() < 0.7, "Great work!")
+        records.append({"messageId": str(uuid.uuid4()), "body": json.dumps(event)})
+    return {"Records": records}, None
+
+
+def _prefetch(f):
+    session = f.next('active_sessions')
+    return {
+        "sessionId": session['id'],
+        "userId": session['userId'],
+        "subject": session['subject'],
+        "yearLevel": session['yearLevel'],
+        "difficulty": "medium",
+        "target": 2,
+    }, None
+
+
+def _batch_generate(f):
+    # One small cell, so repeated runs mostly find it already full
+    return {"target": 5, "concurrency": 2, "subjects": ["maths"],
+            "yearLevels": [random.randint(1, 8)], "difficulties": ["medium"]}, None
+
+
+def _create_link(f):
+    supervisor, _ = f.next('links')
+    student = _student(f)
+    return _http('POST', supervisor, {"studentEmail": f"{student.replace('-', '')}@bench.test"})
+
+
+def _student_stats(f):
+    supervisor, student = f.next('links')
+    return _http('GET', supervisor, path={"studentId": student})
+
+
+def _class_stats(f):
+    return _http('GET', f.next('supervisors'), query={
+        "period": random.choice(['all', 'week', 'month']),
+        "sort": random.choice(['name', 'accuracy', 'points']),
+    })
+
+
+SCENARIOS = [
+    Scenario('auth.get_user', lambda f: _http('GET', _student(f))),
+    Scenario('pets.get_pet', lambda f: _http('GET', _student(f))),
+    Scenario('pets.create_pet', _create_pet),
+    Scenario('pets.feed_pet', lambda f: _http('POST', _student(f))),
+    Scenario('achievements.get_user_achievements', lambda f: _http('GET', _student(f))),
+    Scenario('practice.create_session', _create_session),
+    Scenario('practice.next_question', _next_question),
+    Scenario('practice.complete_session', _complete_session),
+    Scenario('practice.get_recent_sessions', lambda f: _http('GET', _student(f))),
+    Scenario('practice.get_all_sessions', lambda f: _http('GET', _student(f), query={"limit": "20"})),
+    Scenario('practice.prefetch_questions', _prefetch),
+    Scenario('questions.generate', _generate),
+    Scenario('questions.generate_batch', _generate_batch),
+    Scenario('questions.generate_stream', _generate),
+    Scenario('questions.validate', _validate),
+    Scenario('questions.record_answers', _record_answers),
+    Scenario('questions.batch_generate', _batch_generate),
+    Scenario('students.create_link', _create_link),
+    Scenario('students.get_stats', _student_stats),
+    Scenario('students.get_class_stats', _class_stats),
+]
@@ -0,0 +1,94 @@
+-- Base tables the Lambda functions read and write, for a disposable
+-- benchmark database. Applied by benchmark/seed.py before the data is
+-- loaded; migrations/*.sql are applied on top afterwards.
+--
+-- Mirrors the tables in shared/schema.ts with the column names the Lambda
+-- SQL uses. Only primary keys and unique constraints are declared here, as
+-- in the Drizzle schema; every other index comes from migrations/.
+
+CREATE TABLE IF NOT EXISTS users (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    email VARCHAR UNIQUE,
+    "firstName" VARCHAR,
+    "lastName" VARCHAR,
+    "profileImageUrl" VARCHAR,
+    role VARCHAR DEFAULT 'student',
+    "yearLevel" INTEGER DEFAULT 1,
+    "totalPoints" INTEGER DEFAULT 0,
+    "currentStreak" INTEGER DEFAULT 0,
+    "longestStreak" INTEGER DEFAULT 0,
+    "lastPracticeDate" TIMESTAMP,
+    "mathsDifficulty" VARCHAR DEFAULT 'medium',
+    "englishDifficulty" VARCHAR DEFAULT 'medium',
+    "mathsRecentAccuracy" INTEGER DEFAULT 50,
+    "englishRecentAccuracy" INTEGER DEFAULT 50,
+    "createdAt" TIMESTAMP DEFAULT NOW(),
+    "updatedAt" TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS pets (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    "userId" VARCHAR NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+    type VARCHAR NOT NULL,
+    name VARCHAR NOT NULL,
+    level INTEGER DEFAULT 1,
+    experience INTEGER DEFAULT 0,
+    happiness INTEGER DEFAULT 100,
+    hunger INTEGER DEFAULT 0,
+    "lastFed" TIMESTAMP,
+    "createdAt" TIMESTAMP DEFAULT NOW(),
+    "updatedAt" TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS "studentLinks" (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    "supervisorId" VARCHAR NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    "studentId" VARCHAR NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    status VARCHAR NOT NULL DEFAULT 'pending',
+    "createdAt" TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS "practiceSessions" (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    "userId" VARCHAR NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    subject VARCHAR NOT NULL,
+    "yearLevel" INTEGER NOT NULL,
+    "questionsAttempted" INTEGER DEFAULT 0,
+    "questionsCorrect" INTEGER DEFAULT 0,
+    "pointsEarned" INTEGER DEFAULT 0,
+    duration INTEGER DEFAULT 0,
+    "startedAt" TIMESTAMP DEFAULT NOW(),
+    "completedAt" TIMESTAMP,
+    "createdAt" TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS "sessionQuestions" (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    "sessionId" VARCHAR NOT NULL REFERENCES "practiceSessions"(id) ON DELETE CASCADE,
+    "questionId" VARCHAR,
+    question TEXT NOT NULL,
+    "correctAnswer" TEXT,
+    "userAnswer" TEXT,
+    "isCorrect" BOOLEAN,
+    feedback TEXT,
+    topic VARCHAR,
+    difficulty VARCHAR,
+    "answeredAt" TIMESTAMP DEFAULT NOW(),
+    "createdAt" TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS achievements (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR NOT NULL UNIQUE,
+    description TEXT NOT NULL,
+    icon VARCHAR NOT NULL,
+    category VARCHAR NOT NULL,
+    requirement INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS "userAchievements" (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    "userId" VARCHAR NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    "achievementId" VARCHAR NOT NULL REFERENCES achievements(id) ON DELETE CASCADE,
+    "unlockedAt" TIMESTAMP DEFAULT NOW()
+);
@@ -0,0 +1,260 @@
+"""
+Local stand-ins for Auth0 and OpenAI used by the benchmark
+
+JWKSStub generates an RSA key, serves its public half as a JWKS document
+(point AUTH0_JWKS_URL at it) and mints RS256 tokens that shared.auth
+accepts. FakeOpenAI answers /v1/chat/completions (point OPENAI_BASE_URL at
+it) with well-formed questions and validation results after an injected
+delay, optionally failing a fraction of requests, and streams when asked.
+
+Both run on daemon threads on an ephemeral local port:
+    jwks = JWKSStub().start()
+    token = jwks.mint('student-1')
+"""
+import re
+import json
+import time
+import uuid
+import base64
+import random
+import threading
+import itertools
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def _b64url_uint(value):
+    data = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class _Server:
+    """ThreadingHTTPServer on 127.0.0.1 with start()/stop() and a base url"""
+
+    handler_class = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler_class)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class _JWKSHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        stub.fetches += 1
+        body = json.dumps(stub.jwks).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class JWKSStub(_Server):
+    """Serve a JWKS and mint tokens signed by its key"""
+
+    handler_class = _JWKSHandler
+
+    def __init__(self, domain='bench.auth0.local', audience='bench-client'):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        self.domain = domain
+        self.audience = audience
+        self.kid = uuid.uuid4().hex[:16]
+        self.fetches = 0
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._private_pem = key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode('ascii')
+        numbers = key.public_key().public_numbers()
+        self.jwks = {"keys": [{
+            "kty": "RSA",
+            "kid": self.kid,
+            "use": "sig",
+            "alg": "RS256",
+            "n": _b64url_uint(numbers.n),
+            "e": _b64url_uint(numbers.e),
+        }]}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    @property
+    def jwks_url(self):
+        return f"{self.url}/.well-known/jwks.json"
+
+    def env(self):
+        """Environment variables that point shared.auth at this stub"""
+        return {
+            'AUTH0_DOMAIN': self.domain,
+            'AUTH0_CLIENT_ID': self.audience,
+            'AUTH0_JWKS_URL': self.jwks_url,
+        }
+
+    def mint(self, sub, ttl=3600):
+        """Return a token for `sub`, reusing one minted earlier in this run"""
+        with self._lock:
+            token = self._tokens.get(sub)
+        if token is not None:
+            return token
+
+        from jose import jwt
+        now = int(time.time())
+        token = jwt.encode(
+            {"sub": sub, "iss": f"https://{self.domain}/", "aud": self.audience,
+             "iat": now, "exp": now + ttl},
+            self._private_pem,
+            algorithm='RS256',
+            headers={"kid": self.kid},
+        )
+        with self._lock:
+            self._tokens[sub] = token
+        return token
+
+
+class _OpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        request = json.loads(self.rfile.read(length) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            return self._send_json(404, {"error": {"message": "Not found"}})
+
+        stub.requests += 1
+        if random.random() < stub.error_rate:
+            stub.errors += 1
+            time.sleep(stub.delay() / 4)
+            return self._send_json(503, {"error": {"message": "Injected failure", "type": "server_error"}})
+
+        content = json.dumps(stub.respond(request.get('messages') or []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get('model', 'gpt-4o')
+
+        if not request.get('stream'):
+            time.sleep(stub.delay())
+            return self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+        # Half the delay before the first token, the rest spread over the chunks
+        delay = stub.delay()
+        pieces = [content[i:i + stub.chunk_size] for i in range(0, len(content), stub.chunk_size)]
+        time.sleep(delay / 2)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for piece in pieces:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            time.sleep(delay / 2 / len(pieces))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeOpenAI(_Server):
+    """
+    OpenAI-compatible chat completions endpoint with latency injection
+
+    Args:
+        latency: Mean response time in seconds
+        jitter: Responses take latency +/- up to this many seconds
+        error_rate: Fraction of requests answered with a 503
+    """
+
+    handler_class = _OpenAIHandler
+
+    def __init__(self, latency=0.8, jitter=0.2, error_rate=0.0, chunk_size=24):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.requests = 0
+        self.errors = 0
+        self._counter = itertools.count(1)
+
+    def env(self):
+        """Environment variables that point shared.openai_async at this stub"""
+        return {'OPENAI_BASE_URL': f"{self.url}/v1", 'OPENAI_API_KEY': 'bench'}
+
+    def delay(self):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def question(self, topic=None):
+        n = next(self._counter)
+        a, b = random.randint(2, 12), random.randint(2, 12)
+        return {
+            "question": f"What is {a} x {b}? (#{n})",
+            "correctAnswer": str(a * b),
+            "type": "text",
+            "topic": topic or "multiplication",
+            "hint": f"Count up in {a}s",
+            "explanation": f"{a} groups of {b} make {a * b}",
+        }
+
+    def respond(self, messages):
+        """Build the JSON object a real model would return for these prompts"""
+        system = messages[0].get('content', '') if messages else ''
+        user = messages[-1].get('content', '') if messages else ''
+        if '"isCorrect"' in system:
+            correct = random.random() < 0.7
+            return {
+                "isCorrect": correct,
+                "feedback": "Great work!" if correct else "Nearly there, have another go!",
+                "explanation": "Check each step carefully.",
+            }
+
+        topic = re.search(r' about ([^.]+)', user)
+        topic = topic.group(1).strip() if topic else None
+        many = re.search(r'Generate (\d+) different', user)
+        if many:
+            return {"questions": [self.question(topic) for _ in range(int(many.group(1)))]}
+        return self.question(topic)
@@ -0,0 +1,29 @@
+-- Pre-generated question bank served by questions/generate.py
+-- Apply with: psql "$DATABASE_URL" -f migrations/001_question_bank.sql
+
+CREATE TABLE IF NOT EXISTS "questionBank" (
+    id VARCHAR PRIMARY KEY DEFAULT gen_random_uuid(),
+    subject VARCHAR NOT NULL,
+    "yearLevel" INTEGER NOT NULL,
+    topic VARCHAR NOT NULL DEFAULT '',
+    difficulty VARCHAR NOT NULL DEFAULT 'medium',
+    question TEXT NOT NULL,
+    "correctAnswer" TEXT NOT NULL,
+    type VARCHAR NOT NULL DEFAULT 'text',
+    options JSONB,
+    hint TEXT,
+    explanation TEXT,
+    "contentHash" VARCHAR NOT NULL UNIQUE,
+    "createdAt" TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS "IDX_questionBank_lookup"
+    ON "questionBank" (subject, "yearLevel", topic, difficulty);
+
+-- Questions each user has already been served, so they don't see repeats
+CREATE TABLE IF NOT EXISTS "userSeenQuestions" (
+    "userId" VARCHAR NOT NULL,
+    "questionId" VARCHAR NOT NULL REFERENCES "questionBank"(id) ON DELETE CASCADE,
+    "seenAt" TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY ("userId", "questionId")
+);
@@ -0,0 +1,12 @@
+-- Shared cache of LLM answer validations, keyed by normalized (question, answer) hash
+-- Apply with: psql "$DATABASE_URL" -f migrations/002_validation_cache.sql
+
+CREATE TABLE IF NOT EXISTS "validationCache" (
+    "cacheKey" VARCHAR PRIMARY KEY,
+    result JSONB NOT NULL,
+    "createdAt" TIMESTAMP DEFAULT NOW(),
+    "expiresAt" TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS "IDX_validationCache_createdAt"
+    ON "validationCache" ("createdAt");
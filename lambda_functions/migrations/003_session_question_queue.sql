@@ -0,0 +1,13 @@
+-- Per-session queue of prepared questions, filled in the background
+-- Apply with: psql "$DATABASE_URL" -f migrations/003_session_question_queue.sql
+
+CREATE TABLE IF NOT EXISTS "sessionQuestionQueue" (
+    id BIGSERIAL PRIMARY KEY,
+    "sessionId" VARCHAR NOT NULL REFERENCES "practiceSessions"(id) ON DELETE CASCADE,
+    question JSONB NOT NULL,
+    "createdAt" TIMESTAMP DEFAULT NOW()
+);
+
+-- Pops take the lowest id for a session
+CREATE INDEX IF NOT EXISTS "IDX_sessionQuestionQueue_session"
+    ON "sessionQuestionQueue" ("sessionId", id);
@@ -0,0 +1,8 @@
+-- Indexes backing keyset pagination of practice session history
+-- Apply with: psql "$DATABASE_URL" -f migrations/004_practice_session_keyset_indexes.sql
+
+CREATE INDEX IF NOT EXISTS "IDX_practiceSessions_user_started"
+    ON "practiceSessions" ("userId", "startedAt" DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS "IDX_practiceSessions_user_subject_started"
+    ON "practiceSessions" ("userId", subject, "startedAt" DESC, id DESC);
@@ -0,0 +1,40 @@
+-- Per-user, per-subject aggregates maintained incrementally by validate and complete_session
+-- Apply with: psql "$DATABASE_URL" -f migrations/005_user_subject_stats.sql
+
+CREATE TABLE IF NOT EXISTS "userSubjectStats" (
+    "userId" VARCHAR NOT NULL,
+    subject VARCHAR NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    -- Accuracy (0-100) of the most recent completed sessions, oldest first
+    "recentAccuracies" INTEGER[] NOT NULL DEFAULT '{}',
+    "rollingAccuracy" INTEGER,
+    "updatedAt" TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY ("userId", subject)
+);
+
+-- Backfill from existing history
+INSERT INTO "userSubjectStats" ("userId", subject, attempts, correct, sessions, "recentAccuracies", "rollingAccuracy")
+SELECT ps."userId", ps.subject,
+       COALESCE(SUM(ps."questionsAttempted"), 0),
+       COALESCE(SUM(ps."questionsCorrect"), 0),
+       COUNT(ps."completedAt"),
+       COALESCE(recent.accuracies, '{}'),
+       recent.rolling
+FROM "practiceSessions" ps
+LEFT JOIN LATERAL (
+    SELECT ARRAY_AGG(r.accuracy ORDER BY r."completedAt") AS accuracies,
+           ROUND(AVG(r.accuracy))::INTEGER AS rolling
+    FROM (
+        SELECT ROUND(100.0 * s."questionsCorrect" / s."questionsAttempted")::INTEGER AS accuracy,
+               s."completedAt"
+        FROM "practiceSessions" s
+        WHERE s."userId" = ps."userId" AND s.subject = ps.subject
+          AND s."completedAt" IS NOT NULL AND s."questionsAttempted" > 0
+        ORDER BY s."completedAt" DESC
+        LIMIT 5
+    ) r
+) recent ON TRUE
+GROUP BY ps."userId", ps.subject, recent.accuracies, recent.rolling
+ON CONFLICT ("userId", subject) DO NOTHING;
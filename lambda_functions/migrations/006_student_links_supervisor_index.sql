@@ -0,0 +1,5 @@
+-- Index backing the class dashboard's lookup of a supervisor's approved students
+-- Apply with: psql "$DATABASE_URL" -f migrations/006_student_links_supervisor_index.sql
+
+CREATE INDEX IF NOT EXISTS "IDX_studentLinks_supervisor_status"
+    ON "studentLinks" ("supervisorId", status, "studentId");
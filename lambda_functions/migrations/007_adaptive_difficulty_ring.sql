@@ -0,0 +1,28 @@
+-- Ring of recent per-session counts used by shared.adaptive to adjust difficulty
+-- Apply with: psql "$DATABASE_URL" -f migrations/007_adaptive_difficulty_ring.sql
+
+-- (attempted, correct) pairs for the last 5 sessions; session n is in slot n % 5
+ALTER TABLE "userSubjectStats"
+    ADD COLUMN IF NOT EXISTS "recentCounts" INTEGER[] NOT NULL DEFAULT '{0,0,0,0,0,0,0,0,0,0}',
+    ADD COLUMN IF NOT EXISTS "recentSessionCount" INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from the last 5 completed sessions, oldest in slot 0
+UPDATE "userSubjectStats" st
+SET "recentCounts" = recent.counts || array_fill(0, ARRAY[10 - cardinality(recent.counts)]),
+    "recentSessionCount" = cardinality(recent.counts) / 2
+FROM (
+    SELECT s."userId", s.subject,
+           ARRAY_AGG(p.v ORDER BY s."completedAt", p.ord) AS counts
+    FROM (
+        SELECT "userId", subject, "questionsAttempted", COALESCE("questionsCorrect", 0) AS "questionsCorrect",
+               "completedAt",
+               ROW_NUMBER() OVER (PARTITION BY "userId", subject ORDER BY "completedAt" DESC) AS rn
+        FROM "practiceSessions"
+        WHERE "completedAt" IS NOT NULL AND "questionsAttempted" > 0
+    ) s
+    CROSS JOIN LATERAL unnest(ARRAY[s."questionsAttempted", s."questionsCorrect"]) WITH ORDINALITY AS p(v, ord)
+    WHERE s.rn <= 5
+    GROUP BY s."userId", s.subject
+) recent
+WHERE st."userId" = recent."userId" AND st.subject = recent.subject
+  AND st."recentSessionCount" = 0;
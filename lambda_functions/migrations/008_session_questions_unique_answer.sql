@@ -0,0 +1,13 @@
+-- One answer per question per session, so recording an answer twice is a no-op
+-- Apply with: psql "$DATABASE_URL" -f migrations/008_session_questions_unique_answer.sql
+
+-- Keep the first answer where retries already stored duplicates. A missing
+-- "answeredAt" sorts last, and ctid breaks ties, so exactly one row survives
+DELETE FROM "sessionQuestions" a
+USING "sessionQuestions" b
+WHERE a."sessionId" = b."sessionId"
+  AND a."questionId" = b."questionId"
+  AND (COALESCE(a."answeredAt", 'infinity'), a.ctid) > (COALESCE(b."answeredAt", 'infinity'), b.ctid);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "UQ_sessionQuestions_session_question"
+    ON "sessionQuestions" ("sessionId", "questionId");
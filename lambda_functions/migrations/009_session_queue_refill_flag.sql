@@ -0,0 +1,6 @@
+-- Lets only one refill of a session's question queue run at a time (shared.session_queue)
+-- Apply with: psql "$DATABASE_URL" -f migrations/009_session_queue_refill_flag.sql
+
+-- Set when a refill starts and cleared when it ends; a stale value is ignored
+ALTER TABLE "practiceSessions"
+    ADD COLUMN IF NOT EXISTS "refillingAt" TIMESTAMP;
@@ -3,9 +3,12 @@ Lambda function: Create/adopt a pet
 Equivalent to: POST /api/pets
 """
 import json
-from shared import require_auth, execute_insert, execute_one, success_response, error_response
+from shared import instrument, require_auth, with_invocation_connection, execute_insert, execute_one, success_response, error_response
+from shared.cache import invalidate_user
 
+@instrument
 @require_auth
+@with_invocation_connection
 def lambda_handler(event, context, user):
     """
     Create a new pet for the user
@@ -58,6 +61,7 @@ def lambda_handler(event, context, user):
             100,    # happiness
             50      # hunger
         ))
+        invalidate_user(user_id, 'pet')
         
         return success_response(dict(pet), 201)
         
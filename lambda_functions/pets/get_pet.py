@@ -2,9 +2,16 @@
 Lambda function: Get user's pet
 Equivalent to: GET /api/pets
 """
-from shared import require_auth, execute_one, success_response, error_response
+from shared import instrument, require_auth, execute_one, success_response, error_response
+from shared.conditional import conditional_get
+from shared.cache import get_or_load, resource_key
 
+# xmin changes whenever the row is updated
+VERSION_QUERY = 'SELECT xmin::text AS version FROM pets WHERE "userId" = %(user_id)s'
+
+@instrument
 @require_auth
+@conditional_get(VERSION_QUERY, resource='pet')
 def lambda_handler(event, context, user):
     """
     Get authenticated user's virtual pet
@@ -23,7 +30,7 @@ def lambda_handler(event, context, user):
             WHERE "userId" = %s
         """
         
-        pet = execute_one(query, (user_id,))
+        pet = get_or_load(resource_key('pet', user_id), lambda: execute_one(query, (user_id,)))
         
         if not pet:
             return success_response(None)
@@ -3,9 +3,12 @@ Lambda function: Complete practice session
 Equivalent to: POST /api/practice-sessions/{sessionId}/complete
 """
 import json
-from datetime import datetime
-from shared import require_auth, execute_update, execute_one, success_response, error_response
+from shared import instrument, require_auth, success_response, error_response
+from shared.commands import complete_session
+from shared.cache import invalidate_user
+from shared.answer_events import ANSWER_EVENTS_QUEUE_URL, get_session, queue_session_completion
 
+@instrument
 @require_auth
 def lambda_handler(event, context, user):
     """
@@ -14,8 +17,12 @@ def lambda_handler(event, context, user):
     Path parameters:
         sessionId: The session ID to complete
         
+    With an answer events queue, the completion is queued behind the
+    session's answers, which may not all be written yet, and 202 is
+    returned; the worker then awards the points.
+    
     Returns:
-        Updated session and user stats
+        Points earned, or a 202 once the completion is queued
     """
     try:
         # Get session ID from path
@@ -27,45 +34,28 @@ def lambda_handler(event, context, user):
         
         user_id = user['sub']
         
-        # Get session details
-        session_query = """
-            SELECT * FROM "practiceSessions"
-            WHERE id = %s AND "userId" = %s
-        """
-        session = execute_one(session_query, (session_id, user_id))
+        if ANSWER_EVENTS_QUEUE_URL:
+            session = get_session(session_id, user_id)
+            if session is None:
+                return error_response("Session not found", 404)
+            if session['completedAt'] is not None:
+                return error_response("Session already completed", 400)
+            queue_session_completion(session_id, user_id)
+            return success_response({"message": "Session completion queued"}, 202)
+        
+        # Lock, complete and award points in a single statement
+        result = complete_session(session_id, user_id)
         
-        if not session:
+        if not result['found']:
             return error_response("Session not found", 404)
         
-        if session.get('completedAt'):
+        if not result['completed']:
             return error_response("Session already completed", 400)
         
-        # Mark session as complete
-        update_query = """
-            UPDATE "practiceSessions"
-            SET "completedAt" = %s
-            WHERE id = %s
-        """
-        execute_update(update_query, (datetime.utcnow(), session_id))
-        
-        # Update user stats (points, streak)
-        points_earned = session.get('pointsEarned', 0)
-        
-        user_update_query = """
-            UPDATE users
-            SET "totalPoints" = "totalPoints" + %s,
-                "lastPracticeDate" = %s
-            WHERE id = %s
-        """
-        execute_update(user_update_query, (points_earned, datetime.utcnow(), user_id))
+        # Points, difficulty and pet experience changed
+        invalidate_user(user_id, 'profile', 'pet', 'achievements')
         
-        # Update pet experience if user has a pet
-        pet_update_query = """
-            UPDATE pets
-            SET experience = experience + %s
-            WHERE "userId" = %s
-        """
-        execute_update(pet_update_query, (points_earned, user_id))
+        points_earned = result['pointsEarned']
         
         return success_response({
             "message": "Session completed successfully",
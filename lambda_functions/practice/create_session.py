@@ -4,8 +4,10 @@ Equivalent to: POST /api/practice-sessions
 """
 import json
 from datetime import datetime
-from shared import require_auth, execute_insert, success_response, error_response
+from shared import instrument, require_auth, execute_one, success_response, error_response
+from shared.session_queue import enqueue_prefetch
 
+@instrument
 @require_auth
 def lambda_handler(event, context, user):
     """
@@ -35,17 +37,33 @@ def lambda_handler(event, context, user):
         
         user_id = user['sub']
         
-        # Insert practice session
+        # Insert practice session, reading the user's current difficulty in the same statement
         query = """
-            INSERT INTO "practiceSessions" 
-            ("userId", subject, "yearLevel", "startedAt")
-            VALUES (%s, %s, %s, %s)
+            WITH session AS (
+                INSERT INTO "practiceSessions" 
+                ("userId", subject, "yearLevel", "startedAt")
+                VALUES (%s, %s, %s, %s)
+                RETURNING *
+            )
+            SELECT session.*,
+                   COALESCE(CASE WHEN session.subject = 'maths' THEN u."mathsDifficulty"
+                                 ELSE u."englishDifficulty" END, 'medium') AS "_difficulty"
+            FROM session
+            LEFT JOIN users u ON u.id = session."userId"
         """
         
-        session = execute_insert(
+        session = dict(execute_one(
             query,
             (user_id, subject, year_level, datetime.utcnow())
-        )
+        ))
+        difficulty = session.pop('_difficulty')
+        
+        # Start preparing the questions the child will need next
+        try:
+            enqueue_prefetch(session['id'], user_id, subject, year_level, difficulty)
+        except Exception:
+            # Questions will be generated on demand instead
+            pass
         
         return success_response(dict(session), 201)
         
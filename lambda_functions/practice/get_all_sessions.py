@@ -2,30 +2,90 @@
 Lambda function: Get all practice sessions
 Equivalent to: GET /api/practice-sessions/all
 """
-from shared import require_auth, execute_query, success_response, error_response
+from datetime import datetime
+from shared import instrument, require_auth, execute_query, success_response, error_response
+from shared.responses import compress_response
+from shared.pagination import encode_cursor, decode_cursor, parse_page_size
 
+@instrument
+@compress_response
 @require_auth
 def lambda_handler(event, context, user):
     """
-    Get all user's practice sessions
+    Get a page of the user's practice sessions, newest first
+    
+    Query parameters (all optional):
+        limit: Page size (default 20, max 100)
+        cursor: nextCursor from the previous page
+        subject: 'maths' or 'english'
+        from: Only sessions started at or after this ISO date/time
+        to: Only sessions started before this ISO date/time
     
     Returns:
-        List of all practice sessions
+        The page of sessions as an array, as before pagination. When there
+        is another page, its cursor is in the X-Next-Cursor header.
     """
     try:
         user_id = user['sub']
+        params = event.get('queryStringParameters') or {}
+        
+        try:
+            limit = parse_page_size(params.get('limit'))
+        except ValueError as e:
+            return error_response(str(e))
+        
+        try:
+            started_from = datetime.fromisoformat(params['from']) if params.get('from') else None
+            started_to = datetime.fromisoformat(params['to']) if params.get('to') else None
+        except ValueError:
+            return error_response("Invalid date. Use ISO format, e.g. 2024-03-01")
+        
+        cursor = None
+        if params.get('cursor'):
+            try:
+                started_at, session_id = decode_cursor(params['cursor'])
+                cursor = (datetime.fromisoformat(started_at), session_id)
+            except (ValueError, TypeError):
+                return error_response("Invalid cursor")
+        
+        subject = params.get('subject')
+        if subject and subject not in ['maths', 'english']:
+            return error_response("Invalid subject. Must be 'maths' or 'english'")
+        
+        conditions = ['"userId" = %s']
+        values = [user_id]
+        if subject:
+            conditions.append('subject = %s')
+            values.append(subject)
+        if started_from:
+            conditions.append('"startedAt" >= %s')
+            values.append(started_from)
+        if started_to:
+            conditions.append('"startedAt" < %s')
+            values.append(started_to)
+        if cursor:
+            conditions.append('("startedAt", id) < (%s, %s)')
+            values.extend(cursor)
         
-        query = """
+        # Fetch one extra row to know whether another page exists
+        query = f"""
             SELECT id, subject, "yearLevel", "questionsAttempted", "questionsCorrect",
                    "pointsEarned", "startedAt", "completedAt"
             FROM "practiceSessions"
-            WHERE "userId" = %s
-            ORDER BY "startedAt" DESC
+            WHERE {' AND '.join(conditions)}
+            ORDER BY "startedAt" DESC, id DESC
+            LIMIT %s
         """
+        values.append(limit + 1)
         
-        sessions = execute_query(query, (user_id,))
+        sessions = execute_query(query, tuple(values))
         
-        return success_response([dict(s) for s in sessions])
+        response = success_response(sessions[:limit])
+        if len(sessions) > limit:
+            last = sessions[limit - 1]
+            response['headers']['X-Next-Cursor'] = encode_cursor(last['startedAt'], last['id'])
+            response['headers']['Access-Control-Expose-Headers'] = 'X-Next-Cursor'
+        return response
         
     except Exception as e:
         return error_response(str(e), 500)
@@ -2,9 +2,26 @@
 Lambda function: Get recent practice sessions
 Equivalent to: GET /api/practice-sessions/recent
 """
-from shared import require_auth, execute_query, success_response, error_response
+from shared import instrument, require_auth, execute_query, success_response, error_response
+from shared.responses import compress_response
+from shared.conditional import conditional_get
 
+# Row versions of the same 5 sessions; counters can still change after completion
+VERSION_QUERY = """
+    SELECT string_agg(id || ':' || xmin::text, ',') AS version
+    FROM (
+        SELECT id, xmin
+        FROM "practiceSessions"
+        WHERE "userId" = %(user_id)s AND "completedAt" IS NOT NULL
+        ORDER BY "completedAt" DESC
+        LIMIT 5
+    ) recent
+"""
+
+@instrument
+@compress_response
 @require_auth
+@conditional_get(VERSION_QUERY)
 def lambda_handler(event, context, user):
     """
     Get user's recent practice sessions (last 5 completed)
@@ -26,7 +43,7 @@ def lambda_handler(event, context, user):
         
         sessions = execute_query(query, (user_id,))
         
-        return success_response([dict(s) for s in sessions])
+        return success_response(sessions)
         
     except Exception as e:
         return error_response(str(e), 500)
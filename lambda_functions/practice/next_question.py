@@ -0,0 +1,56 @@
+"""
+Lambda function: Get the next question for a practice session
+Equivalent to: GET /api/practice-sessions/{sessionId}/next-question
+"""
+from shared import instrument, require_auth, generate_question, OpenAIUnavailable, success_response, error_response
+from shared.session_queue import pop_question
+from shared.question_bank import save_question, validate_question
+
+@instrument
+@require_auth
+def lambda_handler(event, context, user):
+    """
+    Serve the next prepared question from the session's queue
+    
+    Falls back to generating a question live if the queue is empty (the
+    queue is refilled in the background either way), and writes it back
+    to the question bank like questions/generate.
+    
+    Path parameters:
+        sessionId: The practice session ID
+        
+    Returns:
+        Question with answer, options, hints, etc.
+    """
+    try:
+        path_params = event.get('pathParameters') or {}
+        session_id = path_params.get('sessionId')
+        
+        if not session_id:
+            return error_response("Missing sessionId")
+        
+        session, question = pop_question(session_id, user['sub'])
+        
+        if not session:
+            return error_response("Session not found", 404)
+        
+        if not question:
+            question = generate_question(
+                session['subject'],
+                session['yearLevel'],
+                difficulty=session['difficulty']
+            )
+            if not validate_question(question):
+                try:
+                    save_question(question, session['subject'], session['yearLevel'],
+                                  session['difficulty'], user_id=user['sub'])
+                except Exception:
+                    # A failed write-back only costs a future cache miss
+                    pass
+        
+        return success_response(question)
+        
+    except OpenAIUnavailable:
+        return error_response("Question generation is busy right now, please try again shortly", 503)
+    except Exception as e:
+        return error_response(f"Failed to get next question: {str(e)}", 500)
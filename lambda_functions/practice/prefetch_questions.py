@@ -0,0 +1,34 @@
+"""
+Lambda function: Prepare a practice session's next questions
+Invoked asynchronously by create_session and next_question (not exposed over HTTP)
+"""
+from shared.session_queue import fill_queue, PREFETCH_COUNT
+from shared import instrument
+
+@instrument
+def lambda_handler(event, context):
+    """
+    Fill a session's question queue
+    
+    Event:
+        {
+            "sessionId": "session-id",
+            "userId": "user-id",
+            "subject": "maths" | "english",
+            "yearLevel": 1-8,
+            "difficulty": "easy" | "medium" | "hard",
+            "target": 5
+        }
+        
+    Returns:
+        Number of questions added
+    """
+    added = fill_queue(
+        event['sessionId'],
+        event['userId'],
+        event['subject'],
+        event['yearLevel'],
+        event.get('difficulty') or 'medium',
+        event.get('target') or PREFETCH_COUNT
+    )
+    return {"added": added}
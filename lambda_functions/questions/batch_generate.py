@@ -0,0 +1,245 @@
+"""
+Lambda function / CLI: Bulk-generate questions into the question bank
+Runs nightly so students are served pre-generated questions
+
+Fills every subject x year level (1-8) x topic x difficulty cell of the
+"questionBank" table up to a target count. Cells that are already full are
+skipped, so an interrupted run resumes where it left off.
+
+The nightly Lambda run fans out: the scheduled invocation invokes this
+function asynchronously once per subject and year level, and each shard
+(at most 24 cells) fits well inside the 15 minute Lambda limit.
+
+Run locally from the lambda_functions directory:
+    python -m questions.batch_generate --subject maths --year-level 5
+
+Point OPENAI_BASE_URL at a local OpenAI-compatible stub to test without
+spending API credits.
+"""
+import os
+import json
+import time
+import random
+import argparse
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from shared.openai_client import generate_question
+from shared.question_bank import list_questions, save_question, validate_question, normalize_topic
+from shared import instrument
+
+SUBJECTS = ['maths', 'english']
+YEAR_LEVELS = range(1, 9)
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+# NZ curriculum strands used to spread questions across the bank
+CURRICULUM_TOPICS = {
+    'maths': [
+        'number and place value',
+        'addition and subtraction',
+        'multiplication and division',
+        'fractions and decimals',
+        'measurement',
+        'geometry',
+        'statistics',
+        'patterns and algebra',
+    ],
+    'english': [
+        'spelling',
+        'grammar',
+        'punctuation',
+        'vocabulary',
+        'reading comprehension',
+        'parts of speech',
+    ],
+}
+
+DEFAULT_TARGET_PER_CELL = int(os.environ.get('QUESTION_BANK_TARGET', '20'))
+DEFAULT_CONCURRENCY = int(os.environ.get('QUESTION_BANK_CONCURRENCY', '4'))
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0
+# Questions whose word sets overlap at least this much count as duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.85
+
+
+def _tokens(text):
+    return frozenset(''.join(c if c.isalnum() else ' ' for c in text.lower()).split())
+
+
+def is_near_duplicate(question_text, existing_tokens):
+    """Jaccard similarity check against the questions already in the cell"""
+    tokens = _tokens(question_text)
+    if not tokens:
+        return True
+    for other in existing_tokens:
+        overlap = len(tokens & other) / len(tokens | other)
+        if overlap >= NEAR_DUPLICATE_THRESHOLD:
+            return True
+    return False
+
+
+def generate_with_retry(subject, year_level, topic, difficulty, attempts=MAX_ATTEMPTS):
+    """
+    Generate one schema-valid question, retrying with jittered exponential backoff
+
+    Raises:
+        Exception: If every attempt fails
+    """
+    last_error = None
+    for attempt in range(attempts):
+        try:
+            question = generate_question(subject, year_level, topic, difficulty)
+            problems = validate_question(question)
+            if not problems:
+                return question
+            last_error = Exception(f"Invalid question: {', '.join(problems)}")
+        except Exception as e:
+            last_error = e
+        if attempt < attempts - 1:
+            time.sleep(BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5))
+    raise last_error
+
+
+def fill_cell(subject, year_level, topic, difficulty, target):
+    """
+    Top up one index cell of the bank to `target` questions
+
+    Returns:
+        dict: Counts of questions saved, duplicates skipped and failures
+    """
+    existing = list_questions(subject, year_level, topic, difficulty)
+    existing_tokens = [_tokens(q) for q in existing]
+    stats = {"saved": 0, "duplicates": 0, "failed": 0}
+
+    # Allow a few extra attempts per missing question for duplicates
+    budget = (target - len(existing)) * 2
+    while len(existing_tokens) < target and budget > 0:
+        budget -= 1
+        try:
+            question = generate_with_retry(subject, year_level, topic, difficulty)
+        except Exception:
+            stats["failed"] += 1
+            continue
+
+        if is_near_duplicate(question['question'], existing_tokens):
+            stats["duplicates"] += 1
+            continue
+
+        if save_question(question, subject, year_level, difficulty, topic=topic):
+            existing_tokens.append(_tokens(question['question']))
+            stats["saved"] += 1
+        else:
+            stats["duplicates"] += 1
+
+    return stats
+
+
+def iter_cells(subjects=None, year_levels=None, difficulties=None):
+    for subject in subjects or SUBJECTS:
+        for year_level in year_levels or YEAR_LEVELS:
+            for topic in CURRICULUM_TOPICS[subject]:
+                for difficulty in difficulties or DIFFICULTIES:
+                    yield subject, year_level, normalize_topic(topic), difficulty
+
+
+def run(target=DEFAULT_TARGET_PER_CELL, concurrency=DEFAULT_CONCURRENCY,
+        subjects=None, year_levels=None, difficulties=None, log=print):
+    """
+    Fill the whole bank with bounded concurrency
+
+    Returns:
+        dict: Totals across all cells
+    """
+    totals = {"cells": 0, "saved": 0, "duplicates": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            # Workers report their OpenAI and database time to this invocation's metrics
+            executor.submit(contextvars.copy_context().run, fill_cell, *cell, target): cell
+            for cell in iter_cells(subjects, year_levels, difficulties)
+        }
+        for future in as_completed(futures):
+            subject, year_level, topic, difficulty = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                log(f"{subject} Y{year_level} {topic} {difficulty}: error {e}")
+                continue
+            totals["cells"] += 1
+            for key in ("saved", "duplicates", "failed"):
+                totals[key] += stats[key]
+            if stats["saved"] or stats["failed"]:
+                log(f"{subject} Y{year_level} {topic} {difficulty}: {json.dumps(stats)}")
+
+    return totals
+
+
+def fan_out(function_name, event):
+    """
+    Invoke `function_name` asynchronously once per subject and year level
+
+    Returns:
+        dict: Number of shards started
+    """
+    import boto3
+    client = boto3.client('lambda')
+    shards = 0
+    for subject in event.get('subjects') or SUBJECTS:
+        for year_level in event.get('yearLevels') or YEAR_LEVELS:
+            shard = dict(event, subjects=[subject], yearLevels=[year_level])
+            client.invoke(
+                FunctionName=function_name,
+                InvocationType='Event',
+                Payload=json.dumps(shard).encode('utf-8')
+            )
+            shards += 1
+    return {"shards": shards}
+
+
+@instrument
+def lambda_handler(event, context):
+    """
+    Scheduled entry point
+
+    An event that doesn't name a single subject and year level is split
+    into one asynchronous invocation of this function per subject and
+    year level when running on Lambda.
+
+    Event (all optional):
+        {
+            "target": 20,
+            "concurrency": 4,
+            "subjects": ["maths"],
+            "yearLevels": [1, 2],
+            "difficulties": ["medium"]
+        }
+    """
+    event = {key: value for key, value in (event or {}).items()
+             if key in ('target', 'concurrency', 'subjects', 'yearLevels', 'difficulties')}
+    function_name = os.environ.get('AWS_LAMBDA_FUNCTION_NAME')
+    single_shard = len(event.get('subjects') or SUBJECTS) == 1 and len(event.get('yearLevels') or YEAR_LEVELS) == 1
+    if function_name and not single_shard:
+        return fan_out(function_name, event)
+
+    return run(
+        target=event.get('target', DEFAULT_TARGET_PER_CELL),
+        concurrency=event.get('concurrency', DEFAULT_CONCURRENCY),
+        subjects=event.get('subjects'),
+        year_levels=event.get('yearLevels'),
+        difficulties=event.get('difficulties'),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-generate questions into the question bank")
+    parser.add_argument('--target', type=int, default=DEFAULT_TARGET_PER_CELL,
+                        help="questions per subject/year/topic/difficulty cell")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="maximum OpenAI calls in flight")
+    parser.add_argument('--subject', action='append', choices=SUBJECTS)
+    parser.add_argument('--year-level', action='append', type=int, choices=list(YEAR_LEVELS))
+    parser.add_argument('--difficulty', action='append', choices=DIFFICULTIES)
+    args = parser.parse_args()
+
+    totals = run(args.target, args.concurrency, args.subject, args.year_level, args.difficulty)
+    print(json.dumps(totals))
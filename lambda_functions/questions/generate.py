@@ -3,8 +3,10 @@ Lambda function: Generate question using OpenAI
 Equivalent to: POST /api/questions/generate
 """
 import json
-from shared import require_auth, generate_question, success_response, error_response
+from shared import instrument, require_auth, generate_question, OpenAIUnavailable, success_response, error_response
+from shared.question_bank import get_question, save_question, validate_question
 
+@instrument
 @require_auth
 def lambda_handler(event, context, user):
     """
@@ -14,7 +16,8 @@ def lambda_handler(event, context, user):
         {
             "subject": "maths" | "english",
             "yearLevel": 1-8,
-            "topic": "optional topic"
+            "topic": "optional topic",
+            "difficulty": "easy" | "medium" | "hard" (optional, default "medium")
         }
         
     Returns:
@@ -26,6 +29,7 @@ def lambda_handler(event, context, user):
         subject = body.get('subject')
         year_level = body.get('yearLevel')
         topic = body.get('topic')
+        difficulty = body.get('difficulty') or 'medium'
         
         # Validation
         if not subject or subject not in ['maths', 'english']:
@@ -34,13 +38,31 @@ def lambda_handler(event, context, user):
         if not year_level or not (1 <= year_level <= 8):
             return error_response("Invalid year level")
         
-        # Generate question using OpenAI
-        question = generate_question(subject, year_level, topic)
+        if difficulty not in ['easy', 'medium', 'hard']:
+            return error_response("Invalid difficulty")
+        
+        user_id = user['sub']
+        
+        # Serve from the pre-generated bank when possible
+        question = get_question(user_id, subject, year_level, topic, difficulty)
+        
+        if not question:
+            # Bank miss: generate live and write it back for the next student,
+            # unless it is malformed
+            question = generate_question(subject, year_level, topic, difficulty)
+            if not validate_question(question):
+                try:
+                    save_question(question, subject, year_level, difficulty, user_id=user_id, topic=topic)
+                except Exception:
+                    # A failed write-back only costs a future cache miss
+                    pass
         
         return success_response(question)
         
     except json.JSONDecodeError:
         return error_response("Invalid JSON in request body")
+    except OpenAIUnavailable:
+        return error_response("Question generation is busy right now, please try again shortly", 503)
     except Exception as e:
         return error_response(f"Failed to generate question: {str(e)}", 500)
 
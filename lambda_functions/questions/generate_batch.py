@@ -0,0 +1,78 @@
+"""
+Lambda function: Generate a set of questions for a practice session
+Equivalent to: POST /api/questions/generate/batch
+"""
+import json
+from shared import instrument, require_auth, generate_questions, OpenAIUnavailable, success_response, error_response
+from shared.openai_client import MAX_BATCH_SIZE
+from shared.question_bank import get_questions, save_questions
+
+DEFAULT_COUNT = 5
+
+@instrument
+@require_auth
+def lambda_handler(event, context, user):
+    """
+    Return several curriculum-aligned questions in one response
+    
+    Questions come from the question bank first; any shortfall is generated
+    in a single OpenAI completion and written back to the bank.
+    
+    Request body:
+        {
+            "subject": "maths" | "english",
+            "yearLevel": 1-8,
+            "count": 1-10 (optional, default 5),
+            "topic": "optional topic",
+            "difficulty": "easy" | "medium" | "hard" (optional, default "medium")
+        }
+        
+    Returns:
+        {"questions": [...]} with the same fields as POST /questions/generate
+    """
+    try:
+        # Parse request body
+        body = json.loads(event.get('body', '{}'))
+        subject = body.get('subject')
+        year_level = body.get('yearLevel')
+        count = body.get('count', DEFAULT_COUNT)
+        topic = body.get('topic')
+        difficulty = body.get('difficulty') or 'medium'
+        
+        # Validation
+        if not subject or subject not in ['maths', 'english']:
+            return error_response("Invalid subject")
+        
+        if not year_level or not (1 <= year_level <= 8):
+            return error_response("Invalid year level")
+        
+        if not isinstance(count, int) or not (1 <= count <= MAX_BATCH_SIZE):
+            return error_response(f"Invalid count. Must be between 1 and {MAX_BATCH_SIZE}")
+        
+        if difficulty not in ['easy', 'medium', 'hard']:
+            return error_response("Invalid difficulty")
+        
+        user_id = user['sub']
+        
+        # Serve as much as possible from the pre-generated bank
+        questions = get_questions(user_id, subject, year_level, topic, difficulty, limit=count)
+        
+        missing = count - len(questions)
+        if missing > 0:
+            # Generate the shortfall in one completion and write it back
+            generated = generate_questions(subject, year_level, missing, topic, difficulty)
+            try:
+                save_questions(generated, subject, year_level, difficulty, user_id=user_id, topic=topic)
+            except Exception:
+                # A failed write-back only costs a future cache miss
+                pass
+            questions.extend(generated)
+        
+        return success_response({"questions": questions})
+        
+    except json.JSONDecodeError:
+        return error_response("Invalid JSON in request body")
+    except OpenAIUnavailable:
+        return error_response("Question generation is busy right now, please try again shortly", 503)
+    except Exception as e:
+        return error_response(f"Failed to generate questions: {str(e)}", 500)
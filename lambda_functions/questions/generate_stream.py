@@ -0,0 +1,173 @@
+"""
+Lambda function: Stream a generated question as Server-Sent Events
+Equivalent to: POST /api/questions/generate/stream
+
+Emits a "field" event for each part of the question as soon as the model
+finishes writing it ("question" first, "hint" and "explanation" later),
+then a "done" event with the full question.
+
+Behind API Gateway the events are returned in one buffered body. Run this
+module directly for a local harness that sends them with chunked
+transfer encoding:
+    python -m questions.generate_stream --port 8787
+"""
+import json
+import argparse
+import traceback
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from shared import instrument, require_auth, get_user_from_event, OpenAIUnavailable, error_response
+
+BUSY_MESSAGE = "Question generation is busy right now, please try again shortly"
+FAILED_MESSAGE = "Failed to generate question"
+from shared.question_stream import stream_question, format_sse
+
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Credentials": "true"
+}
+
+
+def parse_request(event):
+    """
+    Parse and validate the request body
+
+    Returns:
+        tuple: (params, error) where params is a dict of generation
+        arguments, or error is an error response
+    """
+    try:
+        body = json.loads(event.get('body') or '{}')
+    except json.JSONDecodeError:
+        return None, error_response("Invalid JSON in request body")
+
+    subject = body.get('subject')
+    year_level = body.get('yearLevel')
+    difficulty = body.get('difficulty') or 'medium'
+
+    if not subject or subject not in ['maths', 'english']:
+        return None, error_response("Invalid subject")
+
+    if not year_level or not (1 <= year_level <= 8):
+        return None, error_response("Invalid year level")
+
+    if difficulty not in ['easy', 'medium', 'hard']:
+        return None, error_response("Invalid difficulty")
+
+    return {
+        "subject": subject,
+        "year_level": year_level,
+        "topic": body.get('topic'),
+        "difficulty": difficulty,
+    }, None
+
+
+def stream_events(params):
+    """
+    Yield SSE-encoded events for one generated question
+
+    Used by the streaming harness: failures after the stream has started
+    are reported as an "error" event, since the status code has already
+    been sent.
+    """
+    try:
+        for event, data in stream_question(**params):
+            yield format_sse(event, data)
+    except OpenAIUnavailable:
+        yield format_sse("error", {"message": BUSY_MESSAGE})
+    except Exception:
+        traceback.print_exc()
+        yield format_sse("error", {"message": FAILED_MESSAGE})
+
+
+@instrument
+@require_auth
+def lambda_handler(event, context, user):
+    """
+    Generate a question and return its events
+
+    Request body:
+        {
+            "subject": "maths" | "english",
+            "yearLevel": 1-8,
+            "topic": "optional topic",
+            "difficulty": "easy" | "medium" | "hard" (optional, default "medium")
+        }
+
+    Returns:
+        text/event-stream body of "field" events followed by "done", or
+        503 like /questions/generate if OpenAI is unavailable
+    """
+    params, error = parse_request(event)
+    if error:
+        return error
+
+    # The body is buffered, so a failure can still change the status code
+    try:
+        body = ''.join(format_sse(name, data)
+                       for name, data in stream_question(**params, user_id=user['sub']))
+    except OpenAIUnavailable:
+        return error_response(BUSY_MESSAGE, 503)
+    except Exception:
+        traceback.print_exc()
+        return error_response(FAILED_MESSAGE, 500)
+
+    return {
+        "statusCode": 200,
+        "headers": SSE_HEADERS,
+        "body": body
+    }
+
+
+class StreamingHarness(BaseHTTPRequestHandler):
+    """Local HTTP harness that streams events with chunked transfer encoding"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send_response(self, response):
+        body = response['body'].encode('utf-8')
+        self.send_response(response['statusCode'])
+        for name, value in response['headers'].items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        event = {
+            "headers": dict(self.headers),
+            "body": self.rfile.read(length).decode('utf-8'),
+        }
+
+        try:
+            user = get_user_from_event(event)
+        except Exception as e:
+            return self._send_response(error_response(str(e), 401))
+
+        params, error = parse_request(event)
+        if error:
+            return self._send_response(error)
+        params['user_id'] = user['sub']
+
+        self.send_response(200)
+        for name, value in SSE_HEADERS.items():
+            self.send_header(name, value)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in stream_events(params):
+            data = chunk.encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local streaming harness for question generation")
+    parser.add_argument('--port', type=int, default=8787)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), StreamingHarness)
+    print(f"Streaming questions on http://127.0.0.1:{args.port}/questions/generate/stream")
+    server.serve_forever()
@@ -0,0 +1,37 @@
+"""
+Lambda function: Write queued answer events
+Triggered by the answer events SQS FIFO queue (not exposed over HTTP)
+"""
+import json
+import traceback
+from shared.answer_events import apply_event
+from shared import instrument, invocation_connection
+
+@instrument
+def lambda_handler(event, context):
+    """
+    Apply one SQS batch of answer and session completion events
+
+    Each event is applied in its own transaction, in delivery order. When
+    one fails, it and every later event in the batch are reported back so
+    SQS redelivers them (ReportBatchItemFailures) and a session's events
+    stay in order; events before it are kept. After maxReceiveCount
+    failures an event moves to the dead-letter queue.
+
+    Event:
+        {"Records": [{"messageId": "...", "body": "<event JSON>"}, ...]}
+
+    Returns:
+        {"batchItemFailures": [{"itemIdentifier": "<messageId>"}, ...]}
+    """
+    records = event.get('Records', [])
+    with invocation_connection():
+        for index, record in enumerate(records):
+            try:
+                apply_event(json.loads(record['body']))
+            except Exception:
+                traceback.print_exc()
+                return {"batchItemFailures": [
+                    {"itemIdentifier": r['messageId']} for r in records[index:]
+                ]}
+    return {"batchItemFailures": []}
@@ -3,9 +3,13 @@ Lambda function: Validate answer using OpenAI
 Equivalent to: POST /api/questions/validate
 """
 import json
-from shared import require_auth, execute_insert, execute_update, validate_answer, success_response, error_response
+from shared import instrument, require_auth, validate_answer, OpenAIUnavailable, success_response, error_response
+from shared.answer_checker import check_answer, check_answer_degraded
+from shared.answer_events import get_session, record_answer_event, flush_answer_events
 
+@instrument
 @require_auth
+@flush_answer_events
 def lambda_handler(event, context, user):
     """
     Validate user's answer and provide feedback
@@ -17,7 +21,9 @@ def lambda_handler(event, context, user):
             "question": "The question text",
             "correctAnswer": "The correct answer",
             "userAnswer": "User's submitted answer",
-            "subject": "maths" | "english"
+            "subject": "maths" | "english",
+            "type": "text" | "multiple_choice" | "fill_blank" | "word_problem" (optional),
+            "options": ["option1", ...] (optional, multiple_choice only)
         }
         
     Returns:
@@ -32,47 +38,37 @@ def lambda_handler(event, context, user):
         correct_answer = body.get('correctAnswer')
         user_answer = body.get('userAnswer')
         subject = body.get('subject')
+        question_type = body.get('type')
+        options = body.get('options')
         
         # Validation
         if not all([session_id, question_id, question, correct_answer, user_answer, subject]):
             return error_response("Missing required fields")
         
-        # Validate answer using OpenAI
-        result = validate_answer(question, correct_answer, user_answer, subject)
+        # Checked before the answer is queued, so the worker never gets an
+        # answer it can't write
+        if get_session(session_id, user['sub']) is None:
+            return error_response("Session not found", 404)
+        
+        # Grade locally when the answer is unambiguous, otherwise ask OpenAI
+        result = check_answer(correct_answer, user_answer, subject, question_type, options)
+        if result is None:
+            try:
+                result = validate_answer(question, correct_answer, user_answer, subject)
+            except OpenAIUnavailable:
+                # Keep the session moving with strict local grading
+                result = check_answer_degraded(correct_answer, user_answer)
         is_correct = result['isCorrect']
         
-        # Record question attempt in database
-        record_query = """
-            INSERT INTO "sessionQuestions"
-            ("sessionId", "questionId", question, "userAnswer", "isCorrect", feedback, "answeredAt")
-            VALUES (%s, %s, %s, %s, %s, %s, NOW())
-        """
-        execute_insert(record_query, (
+        # Buffered and written in one batch when the invocation ends
+        record_answer_event(
             session_id,
             question_id,
             question,
             user_answer,
             is_correct,
             result['feedback']
-        ))
-        
-        # Update session stats
-        if is_correct:
-            update_query = """
-                UPDATE "practiceSessions"
-                SET "questionsAttempted" = COALESCE("questionsAttempted", 0) + 1,
-                    "questionsCorrect" = COALESCE("questionsCorrect", 0) + 1,
-                    "pointsEarned" = COALESCE("pointsEarned", 0) + 10
-                WHERE id = %s
-            """
-        else:
-            update_query = """
-                UPDATE "practiceSessions"
-                SET "questionsAttempted" = COALESCE("questionsAttempted", 0) + 1
-                WHERE id = %s
-            """
-        
-        execute_update(update_query, (session_id,))
+        )
         
         return success_response(result)
         
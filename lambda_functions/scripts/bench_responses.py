@@ -0,0 +1,97 @@
+"""
+Micro-benchmark of the response encoders and compression
+
+Encodes payloads shaped like real handler responses (rows as returned by
+RealDictCursor, with datetime, Decimal and UUID values) with every
+available backend in shared.responses, and reports the time per call and
+the gzip/br sizes.
+
+Run from the lambda_functions directory:
+    python scripts/bench_responses.py
+    python scripts/bench_responses.py --number 2000
+"""
+import os
+import sys
+import gzip
+import uuid
+import random
+import timeit
+import argparse
+from decimal import Decimal
+from datetime import datetime, timedelta
+from psycopg2.extras import RealDictRow
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared import responses
+
+
+def _session(i, start):
+    attempted = random.randint(5, 20)
+    return RealDictRow([
+        ("id", str(uuid.uuid4())),
+        ("subject", random.choice(["maths", "english"])),
+        ("yearLevel", random.randint(1, 8)),
+        ("questionsAttempted", attempted),
+        ("questionsCorrect", random.randint(0, attempted)),
+        ("pointsEarned", random.randint(0, attempted) * 10),
+        ("startedAt", start - timedelta(hours=i)),
+        ("completedAt", start - timedelta(hours=i) + timedelta(minutes=12)),
+    ])
+
+
+def _student(i, start):
+    return RealDictRow([
+        ("id", uuid.uuid4()),
+        ("firstName", f"Student{i}"),
+        ("lastName", "Example"),
+        ("yearLevel", random.randint(1, 8)),
+        ("totalPoints", random.randint(0, 5000)),
+        ("currentStreak", random.randint(0, 30)),
+        ("lastPracticeDate", start - timedelta(days=random.randint(0, 14))),
+        ("attempts", random.randint(0, 400)),
+        ("correct", random.randint(0, 300)),
+        ("sessions", random.randint(0, 40)),
+        ("rollingAccuracy", Decimal(random.randint(0, 100))),
+        ("accuracy", random.randint(0, 100)),
+    ])
+
+
+def payloads():
+    random.seed(1)
+    start = datetime(2025, 3, 1, 9, 30)
+    return {
+        "recent sessions (5)": [_session(i, start) for i in range(5)],
+        "session page (100)": {"sessions": [_session(i, start) for i in range(100)], "nextCursor": "abc"},
+        "class stats (35)": {"students": [_student(i, start) for i in range(35)], "count": 35},
+        "school stats (500)": {"students": [_student(i, start) for i in range(500)], "count": 500},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response encoders")
+    parser.add_argument('--number', type=int, default=500, help="calls per measurement")
+    args = parser.parse_args()
+
+    brotli = responses._brotli()
+    print(f"backends: {', '.join(responses.ENCODERS)}" + ("" if brotli else " (install brotli to measure br)"))
+
+    for name, data in payloads().items():
+        print(f"\n{name}")
+        for backend, encode in responses.ENCODERS.items():
+            per_call = min(timeit.repeat(lambda: encode(data), number=args.number, repeat=3)) / args.number
+            print(f"  {backend:<8} {per_call * 1e6:9.1f} us")
+
+        raw = responses.dumps(data).encode('utf-8')
+        sizes = [f"raw {len(raw)} B", f"gzip {len(gzip.compress(raw, compresslevel=6))} B"]
+        gzip_time = min(timeit.repeat(lambda: gzip.compress(raw, compresslevel=6), number=args.number, repeat=3))
+        timings = [f"gzip {gzip_time / args.number * 1e6:.1f} us"]
+        if brotli:
+            sizes.append(f"br {len(brotli.compress(raw))} B")
+            br_time = min(timeit.repeat(lambda: brotli.compress(raw), number=max(1, args.number // 10), repeat=3))
+            timings.append(f"br {br_time / max(1, args.number // 10) * 1e6:.1f} us")
+        print(f"  size     {', '.join(sizes)}")
+        print(f"  compress {', '.join(timings)}")
+
+
+if __name__ == "__main__":
+    main()
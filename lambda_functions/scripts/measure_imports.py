@@ -0,0 +1,96 @@
+"""
+Report the cold import time of every Lambda handler module
+
+Each handler is imported in a fresh interpreter, the way a cold Lambda
+container would load it, and the median of several runs is reported.
+
+Run from the lambda_functions directory:
+    python scripts/measure_imports.py
+    python scripts/measure_imports.py --runs 10 pets.get_pet auth.get_user
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HANDLER_PACKAGES = ['achievements', 'auth', 'pets', 'practice', 'questions', 'students']
+
+# Runs inside the child interpreter; prints the import time in milliseconds
+_PROBE = """
+import sys, time, importlib
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [m for m in ('openai', 'jose', 'psycopg2', 'boto3') if m in sys.modules]
+print(f"{elapsed:.2f} {','.join(heavy)}")
+"""
+
+
+def find_handlers():
+    handlers = []
+    for package in HANDLER_PACKAGES:
+        directory = os.path.join(ROOT, package)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py') and name != '__init__.py':
+                handlers.append(f"{package}.{name[:-3]}")
+    return handlers
+
+
+def measure(module, runs):
+    """
+    Import `module` in `runs` fresh interpreters
+
+    Returns:
+        tuple: (median milliseconds, heavy dependencies loaded)
+    """
+    # Placeholder credentials so modules that read them at import still load
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'measure-imports')
+    env.setdefault('AUTH0_DOMAIN', 'example.auth0.com')
+
+    times = []
+    heavy = ''
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', _PROBE, module],
+            cwd=ROOT, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        elapsed, _, heavy = result.stdout.strip().partition(' ')
+        times.append(float(elapsed))
+    return statistics.median(times), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of each handler module")
+    parser.add_argument('modules', nargs='*', help="handler modules (default: all)")
+    parser.add_argument('--runs', type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.modules or find_handlers():
+        try:
+            ms, heavy = measure(module, args.runs)
+            results.append({"module": module, "ms": round(ms, 2), "loads": heavy.split(',') if heavy else []})
+        except RuntimeError as e:
+            results.append({"module": module, "ms": None, "error": str(e)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    width = max(len(r['module']) for r in results)
+    for r in results:
+        if r['ms'] is None:
+            print(f"{r['module']:<{width}}  error: {r['error']}")
+        else:
+            print(f"{r['module']:<{width}}  {r['ms']:8.2f} ms  {' '.join(r['loads'])}")
+
+
+if __name__ == "__main__":
+    main()
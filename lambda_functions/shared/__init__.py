@@ -1,25 +1,47 @@
 """
 Shared utilities package for Lambda functions
+
+Attributes are loaded on first access, so a handler only imports the
+modules (and third-party libraries) it actually uses. `from shared import
+require_auth` loads auth.py but never the OpenAI SDK.
 """
-from .database import get_db_connection, execute_query, execute_one, execute_insert, execute_update
-from .auth import validate_token, get_user_from_event, require_auth
-from .openai_client import generate_question, validate_answer
-from .responses import success_response, error_response, unauthorized_response, not_found_response, server_error_response
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'get_db_connection': 'database',
+    'invocation_connection': 'database',
+    'with_invocation_connection': 'database',
+    'execute_query': 'database',
+    'execute_one': 'database',
+    'execute_insert': 'database',
+    'execute_update': 'database',
+    'validate_token': 'auth',
+    'get_user_from_event': 'auth',
+    'require_auth': 'auth',
+    'generate_question': 'openai_client',
+    'generate_questions': 'openai_client',
+    'validate_answer': 'openai_client',
+    'OpenAIUnavailable': 'openai_async',
+    'instrument': 'metrics',
+    'success_response': 'responses',
+    'error_response': 'responses',
+    'unauthorized_response': 'responses',
+    'not_found_response': 'responses',
+    'server_error_response': 'responses',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'get_db_connection',
-    'execute_query',
-    'execute_one',
-    'execute_insert',
-    'execute_update',
-    'validate_token',
-    'get_user_from_event',
-    'require_auth',
-    'generate_question',
-    'validate_answer',
-    'success_response',
-    'error_response',
-    'unauthorized_response',
-    'not_found_response',
-    'server_error_response',
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,63 @@
+"""
+Adaptive difficulty for Lambda functions
+Port of server/adaptiveDifficulty.ts
+
+The counts of a user's recent sessions per subject are kept in a ring in
+"userSubjectStats"."recentCounts": a flat INTEGER[] of RECENT_SESSIONS_WINDOW
+(attempted, correct) pairs, with "recentSessionCount" sessions written so
+far. Session n goes into slot n % RECENT_SESSIONS_WINDOW, overwriting the
+oldest, so completing a session is a constant-size update and the new
+difficulty is worked out in the same statement, without re-reading the
+user's recent sessions. The rules exist only as SQL, so they cannot drift
+from a Python copy.
+"""
+from .stats import RECENT_SESSIONS_WINDOW
+
+DEFAULT_DIFFICULTY = 'medium'
+DEFAULT_ACCURACY = 50
+# Fewer sessions than this in the window keeps the current difficulty
+MIN_SESSIONS = 3
+INCREASE_AT = 85
+DECREASE_AT = 40
+
+
+def _difficulty_sql(column):
+    """
+    Next difficulty for the `adaptive` CTE's row
+
+    Keeps the current difficulty until MIN_SESSIONS sessions are in the
+    window, then moves up a level at INCREASE_AT accuracy or more and down
+    a level at DECREASE_AT or less.
+    """
+    current = f"COALESCE({column}, '{DEFAULT_DIFFICULTY}')"
+    return (
+        f"CASE WHEN LEAST(adaptive.sessions, {RECENT_SESSIONS_WINDOW}) < {MIN_SESSIONS} THEN {current} "
+        f"WHEN adaptive.accuracy >= {INCREASE_AT} THEN CASE {current} WHEN 'easy' THEN 'medium' ELSE 'hard' END "
+        f"WHEN adaptive.accuracy <= {DECREASE_AT} THEN CASE {current} WHEN 'hard' THEN 'medium' ELSE 'easy' END "
+        f"ELSE {current} END"
+    )
+
+
+# CTE fragment for shared.commands: expects `completed` and the
+# `session_stats` CTE from shared.stats, and yields at most one row
+ADAPTIVE_CTE = f"""
+    adaptive AS (
+        SELECT s.subject, s."recentSessionCount" AS sessions,
+               COALESCE((
+                   SELECT ROUND(100.0 * SUM(v) FILTER (WHERE mod(i, 2) = 0)
+                                / NULLIF(SUM(v) FILTER (WHERE mod(i, 2) = 1), 0))::INTEGER
+                   FROM unnest(s."recentCounts") WITH ORDINALITY AS r(v, i)
+               ), {DEFAULT_ACCURACY}) AS accuracy
+        FROM session_stats s
+        JOIN completed c ON c."questionsAttempted" > 0
+    )"""
+
+# SET clause fragment for an UPDATE of users joined to `adaptive`; leaves
+# both subjects unchanged when there is no `adaptive` row
+ADAPTIVE_USER_SET = ",".join(f"""
+            "{subject}Difficulty" = CASE WHEN adaptive.subject = '{subject}'
+                THEN {_difficulty_sql(f'users."{subject}Difficulty"')}
+                ELSE users."{subject}Difficulty" END,
+            "{subject}RecentAccuracy" = CASE WHEN adaptive.subject = '{subject}'
+                THEN adaptive.accuracy ELSE users."{subject}RecentAccuracy" END"""
+    for subject in ('maths', 'english'))
@@ -0,0 +1,214 @@
+"""
+Deterministic answer checking for Lambda functions
+Grades the easy cases locally so only ambiguous answers need an LLM call
+
+check_answer() returns a result shaped like validate_answer() when it can
+decide on its own, or None when the answer should be escalated. Free-text
+answers are only ever accepted locally (exact or numerically equal);
+rejecting one is left to the LLM, since "glad" can be a right answer to a
+question whose stored answer is "happy".
+"""
+import re
+import random
+from difflib import SequenceMatcher
+from fractions import Fraction
+
+# For fill_blank answers, string similarity at or below this is clearly a
+# different word; anything between this and an exact match (e.g. a
+# misspelling) is left to the LLM, since whether a typo counts depends on
+# what the question is testing
+FUZZY_REJECT = 0.5
+
+CORRECT_FEEDBACK = [
+    "Great job! That's correct!",
+    "Ka pai! You got it right!",
+    "Excellent work! That's the right answer.",
+    "Well done! You nailed it!",
+    "Awesome! That's exactly right.",
+]
+
+INCORRECT_FEEDBACK = [
+    "Not quite, but good try! Have another look at the question.",
+    "Nice effort! That's not the answer this time, but you're learning.",
+    "Almost there! Check your working and try the next one.",
+    "Good try! Mistakes help us learn, so keep going.",
+]
+
+_NUMBER_RE = re.compile(
+    r"^(?P<sign>-)?\s*"
+    r"(?:(?P<whole>\d+)\s+(?P<num>\d+)\s*/\s*(?P<den>\d+)"  # mixed number: 1 1/2
+    r"|(?P<fnum>\d+)\s*/\s*(?P<fden>\d+)"                   # fraction: 3/4
+    r"|(?P<dec>\d+(?:\.\d*)?|\.\d+))"                       # integer or decimal
+    r"\s*(?P<percent>%)?$"
+)
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_CURRENCY_RE = re.compile(r"^[$€£]")
+# Punctuation dropped by normalize_text(): everything except a minus sign
+# before a digit, a decimal point inside a number and a percent after one,
+# so "-5", "0.5" and "50%" never collapse into "5", "0 5" and "50"
+_PUNCTUATION_RE = re.compile(r"-(?!\d)|(?<!\d)\.|\.(?!\d)|(?<!\d)%|[^\w\s.%-]")
+_UNIT_RE = re.compile(r"^(?P<value>.*?\d(?:\s*%)?)\s*(?P<unit>[a-zA-Z][a-zA-Z.\s²³]*)?$")
+
+
+def parse_number(text):
+    """
+    Parse a maths answer into an exact Fraction and an optional unit
+
+    Handles thousands separators, decimals, fractions, mixed numbers,
+    percentages, a leading currency symbol and a trailing unit. A percent
+    sign is kept as the unit '%' rather than converted, so "50%" never
+    equals "0.5": whether that counts depends on the question.
+
+    Returns:
+        tuple or None: (Fraction, unit) where unit is '' if none was given
+    """
+    text = str(text).strip().lower()
+    text = _CURRENCY_RE.sub('', text).strip()
+    text = _THOUSANDS_RE.sub('', text)
+
+    match = _UNIT_RE.match(text)
+    if not match:
+        return None
+    value_text = match.group('value').strip()
+    unit = ' '.join((match.group('unit') or '').replace('.', '').split())
+
+    number = _NUMBER_RE.match(value_text)
+    if not number:
+        return None
+
+    if number.group('whole') is not None:
+        if int(number.group('den')) == 0:
+            return None
+        value = int(number.group('whole')) + Fraction(int(number.group('num')), int(number.group('den')))
+    elif number.group('fnum') is not None:
+        if int(number.group('fden')) == 0:
+            return None
+        value = Fraction(int(number.group('fnum')), int(number.group('fden')))
+    else:
+        value = Fraction(number.group('dec'))
+
+    if number.group('sign'):
+        value = -value
+    if number.group('percent'):
+        unit = ' '.join(filter(None, ['%', unit]))
+    return value, unit
+
+
+def normalize_text(text):
+    """Lower-case, drop punctuation (but not signs, decimal points or percents) and collapse whitespace"""
+    text = _PUNCTUATION_RE.sub(' ', str(text).lower())
+    return ' '.join(text.split())
+
+
+def _match_option(answer, options):
+    """
+    The option a multiple_choice answer picks, or None if it picks none
+
+    The raw option text wins; a normalized match only counts when it
+    singles out one option.
+    """
+    raw = str(answer).strip().casefold()
+    for option in options:
+        if str(option).strip().casefold() == raw:
+            return option
+    matches = [o for o in options if normalize_text(o) == normalize_text(answer)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def _result(is_correct, correct_answer):
+    feedback = random.choice(CORRECT_FEEDBACK if is_correct else INCORRECT_FEEDBACK)
+    return {
+        "isCorrect": is_correct,
+        "feedback": feedback,
+        "explanation": f"The correct answer is {correct_answer}.",
+    }
+
+
+def _numbers_equal(correct_answer, user_answer):
+    expected = parse_number(correct_answer)
+    given = parse_number(user_answer)
+    if expected is None or given is None:
+        # e.g. "twelve" - let the LLM decide
+        return False
+
+    expected_value, expected_unit = expected
+    given_value, given_unit = given
+    if expected_unit and given_unit and expected_unit != given_unit:
+        # "120 cm" vs "1.2 m" needs real unit conversion
+        return False
+    if (expected_unit.startswith('%') or given_unit.startswith('%')) and expected_unit != given_unit:
+        # A unit may be left off ("12" for "12 cm"), but 50 is not 50%
+        return False
+    return given_value == expected_value
+
+
+def _check_blank(correct_answer, user_answer):
+    expected = normalize_text(correct_answer)
+    given = normalize_text(user_answer)
+    if not expected:
+        return None
+    if given == expected:
+        return True
+
+    if SequenceMatcher(None, expected, given).ratio() <= FUZZY_REJECT:
+        return False
+    return None
+
+
+def check_answer(correct_answer, user_answer, subject, question_type=None, options=None):
+    """
+    Grade an answer without calling the LLM when the result is unambiguous
+
+    Args:
+        correct_answer: The correct answer
+        user_answer: User's submitted answer
+        subject: 'maths' or 'english'
+        question_type: 'text' | 'multiple_choice' | 'fill_blank' | 'word_problem'
+        options: Choices for multiple_choice questions
+
+    Returns:
+        dict or None: Validation result with isCorrect, feedback and
+        explanation, or None if the answer should go to validate_answer()
+    """
+    if question_type == 'multiple_choice':
+        if options:
+            chosen = _match_option(user_answer, options)
+            if chosen is None:
+                # Not one of the offered choices - maybe a typed variant
+                return None
+            is_correct = str(chosen).strip().casefold() == str(correct_answer).strip().casefold()
+        else:
+            is_correct = normalize_text(user_answer) == normalize_text(correct_answer)
+        return _result(is_correct, correct_answer)
+
+    if question_type == 'fill_blank':
+        is_correct = _check_blank(correct_answer, user_answer)
+        if is_correct is None:
+            return None
+        return _result(is_correct, correct_answer)
+
+    # text, word_problem or unknown: accept only an answer that is plainly
+    # the same, and let the LLM judge everything else
+    expected = normalize_text(correct_answer)
+    if expected and normalize_text(user_answer) == expected:
+        return _result(True, correct_answer)
+    if subject == 'maths' and _numbers_equal(correct_answer, user_answer):
+        return _result(True, correct_answer)
+    return None
+
+
+def check_answer_degraded(correct_answer, user_answer):
+    """
+    Best-effort grading used when OpenAI is unavailable
+
+    Accepts only an exact (normalized) match, so a student is never told a
+    wrong answer is right. The result is flagged with "degraded": True.
+    """
+    if parse_number(correct_answer) is not None and parse_number(user_answer) is not None:
+        is_correct = _numbers_equal(correct_answer, user_answer)
+    else:
+        is_correct = normalize_text(user_answer) == normalize_text(correct_answer)
+
+    result = _result(is_correct, correct_answer)
+    result["degraded"] = True
+    return result
@@ -0,0 +1,289 @@
+"""
+Write-behind recording of answers for Lambda functions
+
+Handlers append answer events with record_answer_event() and return as
+soon as the answer is graded. Events are written in batches: a single
+statement inserts every "sessionQuestions" row (one multi-row VALUES) and
+applies the counters with one aggregated UPDATE per session and one
+upsert per user and subject. Answers are keyed by (sessionId, questionId):
+a repeat is skipped by the insert and, since the counters are computed
+from the rows actually inserted, costs nothing else.
+
+Where events go when an invocation ends:
+  - ANSWER_EVENTS_QUEUE_URL set: sent to an SQS FIFO queue with the
+    session as the message group, and the recordAnswers worker applies
+    each delivered event with apply_event(). Completing a session is
+    queued in the same group (queue_session_completion()), so it is only
+    applied after every answer sent before it and the points it awards
+    are never stale. A failed event is redelivered by SQS, so none is lost.
+  - otherwise (local development): written directly before the response
+    is returned, and the response becomes a 500 if that fails.
+"""
+import os
+import functools
+import json
+import hashlib
+from contextvars import ContextVar
+from datetime import datetime
+from psycopg2.extras import execute_values
+from .database import get_db_connection, execute_one
+from .responses import error_response
+from .commands import complete_session
+from .cache import invalidate_user
+from .stats import POINTS_PER_CORRECT_ANSWER
+
+ANSWER_EVENTS_QUEUE_URL = os.environ.get('ANSWER_EVENTS_QUEUE_URL')
+# SQS accepts at most 10 messages per SendMessageBatch call
+SQS_BATCH_SIZE = 10
+# Rows per INSERT statement when applying a large batch
+APPLY_PAGE_SIZE = 500
+
+APPLY_ANSWER_EVENTS_SQL = """
+    WITH events AS (
+        -- A batch may hold the same answer twice (client retries, SQS redelivery)
+        SELECT DISTINCT ON ("sessionId", "questionId") *
+        FROM (VALUES %s) AS v ("sessionId", "questionId", question, "userAnswer", "isCorrect",
+                               feedback, points, "answeredAt")
+        ORDER BY "sessionId", "questionId", "answeredAt"
+    ), inserted AS (
+        INSERT INTO "sessionQuestions"
+        ("sessionId", "questionId", question, "userAnswer", "isCorrect", feedback, "answeredAt")
+        SELECT "sessionId", "questionId", question, "userAnswer", "isCorrect", feedback, "answeredAt"
+        FROM events
+        ON CONFLICT ("sessionId", "questionId") DO NOTHING
+        RETURNING "sessionId", "questionId", "isCorrect"
+    ), totals AS (
+        -- Only answers that were actually inserted count
+        SELECT i."sessionId",
+               COUNT(*) AS attempted,
+               COUNT(*) FILTER (WHERE i."isCorrect") AS correct,
+               COALESCE(SUM(e.points) FILTER (WHERE i."isCorrect"), 0) AS points
+        FROM inserted i
+        JOIN events e ON e."sessionId" = i."sessionId" AND e."questionId" = i."questionId"
+        GROUP BY i."sessionId"
+    ), sessions AS (
+        UPDATE "practiceSessions" ps
+        SET "questionsAttempted" = COALESCE(ps."questionsAttempted", 0) + totals.attempted,
+            "questionsCorrect" = COALESCE(ps."questionsCorrect", 0) + totals.correct,
+            "pointsEarned" = COALESCE(ps."pointsEarned", 0) + totals.points
+        FROM totals
+        WHERE ps.id = totals."sessionId"
+        RETURNING ps."userId", ps.subject, totals.attempted, totals.correct
+    ), stats AS (
+        INSERT INTO "userSubjectStats" ("userId", subject, attempts, correct)
+        SELECT "userId", subject, SUM(attempted), SUM(correct)
+        FROM sessions
+        GROUP BY "userId", subject
+        ON CONFLICT ("userId", subject) DO UPDATE
+        SET attempts = "userSubjectStats".attempts + EXCLUDED.attempts,
+            correct = "userSubjectStats".correct + EXCLUDED.correct,
+            "updatedAt" = NOW()
+    )
+    SELECT COUNT(*) AS recorded FROM inserted
+"""
+
+APPLY_ANSWER_EVENTS_TEMPLATE = "(%s, %s, %s, %s, %s::boolean, %s, %s::integer, %s::timestamp)"
+
+SESSION_SQL = """
+    SELECT id, "completedAt" FROM "practiceSessions"
+    WHERE id = %(session_id)s AND "userId" = %(user_id)s
+"""
+
+# Events buffered by the current invocation; set by flush_answer_events()
+_buffer = ContextVar('answer_events_buffer', default=None)
+
+
+def answer_event(session_id, question_id, question, user_answer, is_correct, feedback,
+                 points=POINTS_PER_CORRECT_ANSWER):
+    """Build an answer event; `points` are awarded only if the answer is correct"""
+    return {
+        "sessionId": session_id,
+        "questionId": question_id,
+        "question": question,
+        "userAnswer": user_answer,
+        "isCorrect": bool(is_correct),
+        "feedback": feedback,
+        "points": points,
+        "answeredAt": datetime.utcnow().isoformat(),
+    }
+
+
+def completion_event(session_id, user_id):
+    """Build the event that completes a session once its answers are applied"""
+    return {
+        "type": "complete",
+        "sessionId": session_id,
+        "userId": user_id,
+        "completedAt": datetime.utcnow().isoformat(),
+    }
+
+
+def get_session(session_id, user_id):
+    """
+    Look up one of the user's sessions before an event for it is accepted
+
+    Checked synchronously so the worker is never sent an event for a
+    session that doesn't exist or belongs to someone else.
+
+    Returns:
+        dict or None: id and completedAt, or None if not the user's session
+    """
+    return execute_one(SESSION_SQL, {'session_id': session_id, 'user_id': user_id})
+
+
+def record_answer_event(*args, **kwargs):
+    """
+    Buffer one graded answer; it is written when the invocation ends
+
+    Takes the same arguments as answer_event(). Only valid inside a
+    handler wrapped by flush_answer_events(), which owns the buffer.
+    """
+    buffer = _buffer.get()
+    if buffer is None:
+        raise RuntimeError("record_answer_event() called outside @flush_answer_events")
+    buffer.append(answer_event(*args, **kwargs))
+
+
+def apply_answer_events(events):
+    """
+    Write a batch of answer events and their counters in one transaction
+
+    Idempotent: an answer already stored for its (sessionId, questionId),
+    or repeated within the batch, is skipped and advances no counters.
+
+    Returns:
+        int: Number of answers newly recorded
+    """
+    if not events:
+        return 0
+
+    rows = [
+        (e['sessionId'], e['questionId'], e['question'], e['userAnswer'],
+         e['isCorrect'], e['feedback'], e.get('points', POINTS_PER_CORRECT_ANSWER), e['answeredAt'])
+        for e in events
+    ]
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            results = execute_values(
+                cursor, APPLY_ANSWER_EVENTS_SQL, rows,
+                template=APPLY_ANSWER_EVENTS_TEMPLATE, page_size=APPLY_PAGE_SIZE, fetch=True
+            )
+    return sum(r['recorded'] for r in results)
+
+
+def record_answer(*args, **kwargs):
+    """
+    Record one answer immediately, bypassing the buffer
+
+    Takes the same arguments as answer_event().
+
+    Returns:
+        bool: True if recorded, False if this answer was already recorded
+    """
+    return apply_answer_events([answer_event(*args, **kwargs)]) == 1
+
+
+def apply_event(event):
+    """
+    Apply one queued event in its own transaction
+
+    Answers go through apply_answer_events(); completions run
+    shared.commands.complete_session() and drop the user's cached
+    resources it changed.
+
+    Returns:
+        dict: {"recorded": n} for an answer, complete_session()'s result for a completion
+    """
+    if event.get('type') == 'complete':
+        completed_at = datetime.fromisoformat(event['completedAt']) if event.get('completedAt') else None
+        result = complete_session(event['sessionId'], event['userId'], completed_at)
+        if result['completed']:
+            invalidate_user(event['userId'], 'profile', 'pet', 'achievements')
+        return result
+    return {"recorded": apply_answer_events([event])}
+
+
+def _deduplication_id(event):
+    # Within SQS's five minute window a resent answer or completion is dropped
+    key = f"{event.get('type', 'answer')}:{event['sessionId']}:{event.get('questionId', '')}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def send_events(events):
+    """
+    Send events to the FIFO queue, grouped by session so each session's
+    events are applied in the order they were sent
+    """
+    import boto3
+    sqs = boto3.client('sqs')
+    for start in range(0, len(events), SQS_BATCH_SIZE):
+        batch = events[start:start + SQS_BATCH_SIZE]
+        response = sqs.send_message_batch(
+            QueueUrl=ANSWER_EVENTS_QUEUE_URL,
+            Entries=[
+                {
+                    "Id": str(i),
+                    "MessageBody": json.dumps(event),
+                    "MessageGroupId": event['sessionId'],
+                    "MessageDeduplicationId": _deduplication_id(event),
+                }
+                for i, event in enumerate(batch)
+            ]
+        )
+        if response.get('Failed'):
+            raise Exception(f"Failed to queue {len(response['Failed'])} answer events")
+
+
+def queue_session_completion(session_id, user_id):
+    """
+    Queue a session's completion behind its answers
+
+    Only valid with ANSWER_EVENTS_QUEUE_URL set; without a queue answers
+    are already written, so complete the session directly.
+    """
+    send_events([completion_event(session_id, user_id)])
+
+
+def flush(events):
+    """
+    Hand events to the queue, or write them directly without one
+
+    If this raises, the caller must report the failure so the client
+    retries the answer.
+    """
+    if not events:
+        return
+
+    if ANSWER_EVENTS_QUEUE_URL:
+        send_events(events)
+    else:
+        apply_answer_events(events)
+
+
+def flush_answer_events(handler):
+    """
+    Decorator that flushes buffered answer events before the handler returns
+
+    If the events can't be flushed the response is replaced with a 500, so
+    a client is never told an answer was recorded when it wasn't.
+
+    Usage:
+        @require_auth
+        @flush_answer_events
+        def lambda_handler(event, context, user):
+            ...
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        events = []
+        token = _buffer.set(events)
+        try:
+            response = handler(*args, **kwargs)
+        finally:
+            _buffer.reset(token)
+        try:
+            flush(events)
+        except Exception as e:
+            return error_response(f"Failed to record answer: {str(e)}", 500)
+        return response
+    return wrapper
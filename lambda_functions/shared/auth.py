@@ -3,24 +3,218 @@ Auth0 JWT validation utilities for Lambda functions
 Validates JWT tokens from Auth0 without requiring Express sessions
 """
 import os
+import functools
 import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from jose import jwt, JWTError
 from six.moves.urllib.request import urlopen
+from .metrics import span
 
 # Auth0 configuration
 AUTH0_DOMAIN = os.environ.get('AUTH0_DOMAIN')
 AUTH0_CLIENT_ID = os.environ.get('AUTH0_CLIENT_ID')
 ALGORITHMS = ["RS256"]
 
+# JWKS cache configuration
+# AUTH0_JWKS_URL can point at a local stub server for testing
+AUTH0_JWKS_URL = os.environ.get('AUTH0_JWKS_URL') or f"https://{AUTH0_DOMAIN}/.well-known/jwks.json"
+JWKS_CACHE_TTL = float(os.environ.get('JWKS_CACHE_TTL', '3600'))
+JWKS_FETCH_TIMEOUT = float(os.environ.get('JWKS_FETCH_TIMEOUT', '3'))
+# Minimum gap between refreshes triggered by unknown key IDs
+JWKS_MIN_REFRESH_INTERVAL = float(os.environ.get('JWKS_MIN_REFRESH_INTERVAL', '30'))
+
+# Verified-token cache configuration
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', '1024'))
+
+
+class JWKSCache:
+    """
+    In-process cache of the Auth0 JSON Web Key Set
+
+    Keys are held for `ttl` seconds. A token signed with an unknown `kid`
+    triggers one refresh (single-flight: concurrent callers wait for the
+    same fetch), rate-limited by `min_refresh_interval`. If a refresh fails
+    the previous keys keep being served.
+    """
+
+    def __init__(self, url, ttl=JWKS_CACHE_TTL, timeout=JWKS_FETCH_TIMEOUT,
+                 min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.min_refresh_interval = min_refresh_interval
+        self._jwks = None
+        self._keys = {}
+        self._fetched_at = 0.0
+        self._attempted_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, jwks):
+        """Replace the cached key set"""
+        self._jwks = jwks
+        self._keys = {key["kid"]: key for key in jwks.get("keys", []) if "kid" in key}
+        self._fetched_at = time.monotonic()
+
+    def preload(self):
+        """
+        Seed the cache on cold start from AUTH0_JWKS (JSON) or AUTH0_JWKS_FILE (path)
+
+        Preloaded keys are treated as fresh for one TTL like fetched keys.
+        """
+        raw = os.environ.get('AUTH0_JWKS')
+        path = os.environ.get('AUTH0_JWKS_FILE')
+        try:
+            if raw:
+                self.load(json.loads(raw))
+            elif path and os.path.exists(path):
+                with open(path) as f:
+                    self.load(json.load(f))
+        except (ValueError, OSError):
+            # Fall back to fetching on first use
+            pass
+
+    def _is_fresh(self):
+        return self._jwks is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def _fetch(self):
+        response = urlopen(self.url, timeout=self.timeout)
+        return json.loads(response.read())
+
+    def refresh(self, force=False):
+        """
+        Fetch the key set, letting only one caller hit the network at a time
+
+        Returns:
+            bool: True if the cache now holds keys (fresh or stale)
+        """
+        seen = self._fetched_at
+        with self._lock:
+            # Another caller refreshed while we waited for the lock
+            if self._fetched_at != seen and self._jwks is not None:
+                return True
+            if not force and self._is_fresh():
+                return True
+            # Back off while the last attempt is recent; stale keys keep serving
+            if self._jwks is not None and time.monotonic() - self._attempted_at < self.min_refresh_interval:
+                return True
+            self._attempted_at = time.monotonic()
+            try:
+                self.load(self._fetch())
+            except Exception:
+                if self._jwks is None:
+                    raise
+        return True
+
+    def get_jwks(self):
+        """Return the cached key set, refreshing it if the TTL has expired"""
+        if not self._is_fresh():
+            self.refresh()
+        return self._jwks
+
+    def get_key(self, kid):
+        """
+        Return the JWK for `kid`, refreshing once if the key is unknown
+
+        Returns:
+            dict or None: The matching JWK
+        """
+        self.get_jwks()
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._attempted_at >= self.min_refresh_interval:
+            # Keys may have been rotated since the last fetch
+            self.refresh(force=True)
+            key = self._keys.get(kid)
+        return key
+
+
+jwks_cache = JWKSCache(AUTH0_JWKS_URL)
+jwks_cache.preload()
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed signature verification
+
+    Entries are keyed by the SHA-256 digest of the raw token (the token
+    itself is never stored) and map to the decoded payload. An entry is
+    only served while the payload's own `exp`/`nbf` window is valid, so a
+    hit never extends a token's lifetime.
+    """
+
+    def __init__(self, max_size=TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _is_current(payload, now):
+        exp = payload.get('exp')
+        nbf = payload.get('nbf')
+        if exp is None or now >= exp:
+            return False
+        if nbf is not None and now < nbf:
+            return False
+        return True
+
+    def get(self, token):
+        """Return the cached payload for `token`, or None on a miss"""
+        digest = self._digest(token)
+        with self._lock:
+            payload = self._entries.get(digest)
+            if payload is not None and not self._is_current(payload, time.time()):
+                del self._entries[digest]
+                payload = None
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def put(self, token, payload):
+        """Remember a verified payload (tokens without `exp` are not cached)"""
+        if self.max_size <= 0 or not self._is_current(payload, time.time()):
+            return
+        digest = self._digest(token)
+        with self._lock:
+            self._entries[digest] = payload
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return hit/miss counters and current size"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
+
+
+token_cache = VerifiedTokenCache()
+
 def get_auth0_public_key():
     """
     Fetch Auth0 public key for JWT verification
-    Cached for performance
+    Cached in-process for JWKS_CACHE_TTL seconds
     """
-    jsonurl = urlopen(f"https://{AUTH0_DOMAIN}/.well-known/jwks.json")
-    jwks = json.loads(jsonurl.read())
-    return jwks
+    return jwks_cache.get_jwks()
 
+@span('auth')
 def validate_token(token):
     """
     Validate Auth0 JWT token and return user info
@@ -34,25 +228,26 @@ def validate_token(token):
     Raises:
         JWTError: If token is invalid
     """
+    # Skip signature verification for tokens we've already verified
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+    
     try:
-        # Get Auth0 public key
-        jwks = get_auth0_public_key()
-        
         # Decode token header to get key ID
         unverified_header = jwt.get_unverified_header(token)
         
         # Find the correct signing key
         rsa_key = {}
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                break
+        key = jwks_cache.get_key(unverified_header.get("kid"))
+        if key:
+            rsa_key = {
+                "kty": key["kty"],
+                "kid": key["kid"],
+                "use": key["use"],
+                "n": key["n"],
+                "e": key["e"]
+            }
         
         if not rsa_key:
             raise JWTError("Unable to find appropriate key")
@@ -66,6 +261,7 @@ def validate_token(token):
             issuer=f"https://{AUTH0_DOMAIN}/"
         )
         
+        token_cache.put(token, payload)
         return payload
         
     except JWTError as e:
@@ -111,6 +307,7 @@ def require_auth(handler):
             # user is automatically injected
             return {"statusCode": 200, "body": json.dumps({"userId": user['sub']})}
     """
+    @functools.wraps(handler)
     def wrapper(event, context):
         try:
             user = get_user_from_event(event)
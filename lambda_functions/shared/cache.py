@@ -0,0 +1,310 @@
+"""
+Caches for Lambda functions
+
+TTLCache is a small in-process LRU. Entries live for the lifetime of a
+warm container, so it only suits data where being a few seconds stale is
+acceptable.
+
+The read-through cache (get_or_load / invalidate_user) fronts per-user
+reads such as the profile, pet and achievements. Its backend is chosen by
+CACHE_URL:
+  - unset: a TTLCache in each warm container (short TTL, since other
+    containers don't see its invalidations)
+  - redis://[:password@]host:port[/db]: any server speaking the Redis
+    protocol (ElastiCache, a local redis-server, or a stand-in), shared by
+    every container
+
+Concurrent misses for the same key are collapsed so only one caller runs
+the loader (per container in memory, across containers with Redis).
+Handlers that write cached data call invalidate_user() after committing.
+"""
+import os
+import json
+import time
+import uuid
+import socket
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+CACHE_URL = os.environ.get('CACHE_URL')
+CACHE_TTL = float(os.environ.get('CACHE_TTL', '60'))
+# Other containers can't see an in-process invalidation, so keep this short
+CACHE_MEMORY_TTL = float(os.environ.get('CACHE_MEMORY_TTL', '10'))
+CACHE_MEMORY_SIZE = int(os.environ.get('CACHE_MEMORY_SIZE', '1024'))
+# Socket timeout for the Redis backend; a slow cache is treated as a miss
+CACHE_TIMEOUT = float(os.environ.get('CACHE_TIMEOUT', '0.2'))
+# How long one caller may hold a key's load lock, and how long others wait for it
+CACHE_LOCK_TIMEOUT = float(os.environ.get('CACHE_LOCK_TIMEOUT', '2'))
+# After a Redis error, skip the cache for this long instead of timing out on every read
+CACHE_RETRY_AFTER = 5.0
+
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, ttl, max_size=256):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value, or `default` if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MemoryBackend:
+    """Read-through backend over a TTLCache, with per-key load locks"""
+
+    def __init__(self, ttl=CACHE_MEMORY_TTL, max_size=CACHE_MEMORY_SIZE):
+        self.ttl = ttl
+        self.store = TTLCache(ttl, max_size)
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def get(self, key):
+        return self.store.get(key, MISSING)
+
+    def set(self, key, value, ttl):
+        self.store.set(key, value, ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.delete(key)
+
+    def get_or_load(self, key, loader, ttl=None):
+        ttl = ttl or self.ttl
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        with self._locks[hash(key) % len(self._locks)]:
+            # Another thread may have loaded it while we waited
+            value = self.get(key)
+            if value is MISSING:
+                value = loader()
+                self.set(key, value, ttl)
+            return value
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RESPConnection:
+    """Minimal client for the Redis serialization protocol (RESP2)"""
+
+    def __init__(self, url, timeout=CACHE_TIMEOUT):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile('rb')
+        if self.password:
+            self._send('AUTH', self.password)
+        if self.db:
+            self._send('SELECT', self.db)
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            raise RedisError(rest.decode('utf-8'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+    def _send(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        self._sock.sendall(b''.join(parts))
+        return self._read()
+
+    def command(self, *args):
+        """Send one command and return its reply, reconnecting once if the socket died"""
+        if self._sock is None:
+            self._connect()
+        try:
+            return self._send(*args)
+        except (ConnectionError, BrokenPipeError):
+            self.close()
+            self._connect()
+            return self._send(*args)
+        except (OSError, RedisError):
+            self.close()
+            raise
+
+
+class RedisBackend:
+    """
+    Read-through backend on a Redis-protocol server
+
+    Values are stored as JSON. A miss takes a short-lived lock key
+    (SET NX PX) so one container loads while the others briefly poll for
+    its result. Any cache error degrades to calling the loader directly.
+    """
+
+    def __init__(self, url, ttl=CACHE_TTL, lock_timeout=CACHE_LOCK_TIMEOUT):
+        self.ttl = ttl
+        self.conn = RESPConnection(url)
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self._down_until = 0
+
+    def _command(self, *args):
+        if time.monotonic() < self._down_until:
+            raise ConnectionError("Cache unavailable")
+        try:
+            with self._lock:
+                return self.conn.command(*args)
+        except (OSError, RedisError):
+            self._down_until = time.monotonic() + CACHE_RETRY_AFTER
+            raise
+
+    def get(self, key):
+        raw = self._command('GET', key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        from .responses import json_default
+        self._command('SET', key, json.dumps(value, default=json_default), 'PX', int(ttl * 1000))
+
+    def delete(self, *keys):
+        if keys:
+            self._command('DEL', *keys)
+
+    def get_or_load(self, key, loader, ttl=None):
+        ttl = ttl or self.ttl
+        try:
+            value = self.get(key)
+            if value is not MISSING:
+                return value
+            lock_key = f"lock:{key}"
+            token = uuid.uuid4().hex
+            acquired = self._command('SET', lock_key, token, 'NX', 'PX', int(self.lock_timeout * 1000))
+        except (OSError, RedisError):
+            return loader()
+
+        if not acquired:
+            # Someone else is loading; wait for their value rather than piling on
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                try:
+                    value = self.get(key)
+                except (OSError, RedisError):
+                    break
+                if value is not MISSING:
+                    return value
+
+        value = loader()
+        try:
+            self.set(key, value, ttl)
+            if acquired:
+                # Release only our own lock
+                if self._command('GET', lock_key) == token.encode('utf-8'):
+                    self._command('DEL', lock_key)
+        except (OSError, RedisError):
+            pass
+        return value
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the read-through backend configured by CACHE_URL, creating it on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = RedisBackend(CACHE_URL) if CACHE_URL else MemoryBackend()
+    return _backend
+
+
+def resource_key(resource, user_id, part='data'):
+    """Cache key for one user's resource ('profile', 'pet', 'achievements')"""
+    return f"{resource}:{part}:{user_id}"
+
+
+def get_or_load(key, loader, ttl=None):
+    """
+    Return the cached value for `key`, calling `loader()` and caching its result on a miss
+
+    None is cached like any other value. `ttl` defaults to the backend's
+    (CACHE_TTL for Redis, CACHE_MEMORY_TTL in process).
+    """
+    return get_backend().get_or_load(key, loader, ttl)
+
+
+def invalidate_user(user_id, *resources):
+    """
+    Drop a user's cached resources after a write
+
+    Call after the write has committed. Errors are swallowed: entries
+    expire after their TTL regardless. With the in-process backend only
+    this container is invalidated.
+    """
+    keys = [resource_key(r, user_id, part) for r in resources for part in ('data', 'version')]
+    try:
+        get_backend().delete(*keys)
+    except (OSError, RedisError):
+        pass
@@ -0,0 +1,142 @@
+"""
+Single-round-trip command statements for Lambda functions
+
+Each command is one writable-CTE statement that does all of a handler's
+reads and writes and returns a single row describing the outcome, so the
+handler can pick its response without any further queries.
+"""
+from datetime import datetime
+from .database import execute_one
+from .stats import COMPLETE_SESSION_STATS_CTE
+from .adaptive import ADAPTIVE_CTE, ADAPTIVE_USER_SET
+
+PET_FEED_COST = 10
+
+COMPLETE_SESSION_SQL = """
+    WITH session AS (
+        SELECT id, "completedAt", COALESCE("pointsEarned", 0) AS points
+        FROM "practiceSessions"
+        WHERE id = %(session_id)s AND "userId" = %(user_id)s
+        FOR UPDATE
+    ), completed AS (
+        UPDATE "practiceSessions" ps
+        SET "completedAt" = %(now)s
+        FROM session
+        WHERE ps.id = session.id AND session."completedAt" IS NULL
+        RETURNING ps.id, ps."userId", ps.subject, ps."questionsAttempted", ps."questionsCorrect",
+                  session.points
+    ),""" + COMPLETE_SESSION_STATS_CTE + """,""" + ADAPTIVE_CTE + """, user_update AS (
+        UPDATE users
+        SET "totalPoints" = "totalPoints" + completed.points,
+            "lastPracticeDate" = %(now)s,""" + ADAPTIVE_USER_SET + """
+        FROM completed
+        LEFT JOIN adaptive ON TRUE
+        WHERE users.id = %(user_id)s
+        RETURNING users.id
+    ), pet_update AS (
+        UPDATE pets
+        SET experience = experience + completed.points
+        FROM completed
+        WHERE pets."userId" = %(user_id)s
+        RETURNING pets.id
+    )
+    SELECT EXISTS (SELECT 1 FROM session) AS "found",
+           EXISTS (SELECT 1 FROM completed) AS "completed",
+           COALESCE((SELECT points FROM session), 0) AS "pointsEarned"
+"""
+
+FEED_PET_SQL = """
+    WITH account AS (
+        SELECT id, "totalPoints"
+        FROM users
+        WHERE id = %(user_id)s
+        FOR UPDATE
+    ), pet AS (
+        SELECT id FROM pets WHERE "userId" = %(user_id)s
+    ), spend AS (
+        UPDATE users
+        SET "totalPoints" = users."totalPoints" - %(cost)s
+        FROM account
+        WHERE users.id = account.id
+          AND account."totalPoints" >= %(cost)s
+          AND EXISTS (SELECT 1 FROM pet)
+        RETURNING users.id
+    ), fed AS (
+        UPDATE pets
+        SET happiness = LEAST(happiness + 10, 100),
+            hunger = GREATEST(hunger - 20, 0)
+        WHERE "userId" = %(user_id)s AND EXISTS (SELECT 1 FROM spend)
+        RETURNING pets.*
+    )
+    SELECT COALESCE((SELECT "totalPoints" FROM account) >= %(cost)s, false) AS "hasPoints",
+           EXISTS (SELECT 1 FROM pet) AS "hasPet",
+           (SELECT row_to_json(fed) FROM fed) AS "pet"
+"""
+
+CREATE_STUDENT_LINK_SQL = """
+    WITH supervisor AS (
+        SELECT id, role FROM users WHERE id = %(supervisor_id)s
+    ), student AS (
+        SELECT id, role FROM users WHERE email = %(student_email)s
+    ), existing AS (
+        SELECT l.id
+        FROM "studentLinks" l
+        JOIN student ON l."studentId" = student.id
+        WHERE l."supervisorId" = %(supervisor_id)s
+    ), link AS (
+        INSERT INTO "studentLinks" ("supervisorId", "studentId", status)
+        SELECT supervisor.id, student.id, 'pending'
+        FROM supervisor, student
+        WHERE supervisor.role IN ('parent', 'teacher')
+          AND student.role = 'student'
+          AND NOT EXISTS (SELECT 1 FROM existing)
+        RETURNING *
+    )
+    SELECT (SELECT role FROM supervisor) AS "supervisorRole",
+           (SELECT role FROM student) AS "studentRole",
+           EXISTS (SELECT 1 FROM existing) AS "linkExists",
+           (SELECT row_to_json(link) FROM link) AS "link"
+"""
+
+
+def complete_session(session_id, user_id, completed_at=None):
+    """
+    Mark a session complete, award its points to the user and their pet,
+    fold its accuracy into the user's subject stats and adapt their
+    difficulty for the subject
+
+    Args:
+        completed_at: When the student finished; defaults to now (queued
+            completions pass the time they were requested)
+
+    Returns:
+        dict: found, completed (False if it was already complete), pointsEarned
+    """
+    return execute_one(COMPLETE_SESSION_SQL, {
+        'session_id': session_id,
+        'user_id': user_id,
+        'now': completed_at or datetime.utcnow(),
+    })
+
+
+def feed_pet(user_id, cost=PET_FEED_COST):
+    """
+    Spend points to feed the user's pet
+
+    Returns:
+        dict: hasPoints, hasPet, pet (the updated pet, or None if nothing changed)
+    """
+    return execute_one(FEED_PET_SQL, {'user_id': user_id, 'cost': cost})
+
+
+def create_student_link(supervisor_id, student_email):
+    """
+    Create a pending supervisor -> student link if the pair is eligible
+
+    Returns:
+        dict: supervisorRole, studentRole, linkExists, link (None if not created)
+    """
+    return execute_one(CREATE_STUDENT_LINK_SQL, {
+        'supervisor_id': supervisor_id,
+        'student_email': student_email,
+    })
@@ -0,0 +1,127 @@
+"""
+Conditional GET support for read-only Lambda functions
+
+A handler declares a cheap "version" query for its resource (a row's
+xmin, a MAX of an insert-only timestamp, ...). The decorator runs that
+first, and if the client already holds that version it answers 304
+without running the handler's query or encoding a body.
+"""
+import hashlib
+import functools
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from .database import execute_one, invocation_connection
+from .cache import CACHE_URL, get_or_load, resource_key
+from .responses import not_modified_response
+
+
+def _header(event, name):
+    headers = (event or {}).get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def make_etag(version):
+    """Weak ETag for a version token (weak, since the body may be re-encoded)"""
+    digest = hashlib.sha1(str(version).encode('utf-8')).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def format_http_date(value):
+    """Format a (naive UTC or aware) datetime as an HTTP date"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(event, etag, last_modified=None):
+    """
+    Check the request's If-None-Match / If-Modified-Since against the current version
+
+    If-None-Match takes precedence, as in RFC 9110.
+    """
+    if_none_match = _header(event, 'if-none-match')
+    if if_none_match is not None:
+        if if_none_match.strip() == '*':
+            return True
+        # Weak comparison: ignore the W/ prefix on either side
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return etag.removeprefix('W/') in tags
+
+    if_modified_since = _header(event, 'if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_get(version_query, resource=None):
+    """
+    Decorator that answers unchanged polls with 304 Not Modified
+
+    Args:
+        version_query: SQL taking %(user_id)s and returning at most one row
+            with a "version" column, and optionally a "lastModified"
+            timestamp that only moves forward when the resource changes
+        resource: With a shared cache (CACHE_URL), cache the version under
+            this shared.cache resource name ('profile', 'pet',
+            'achievements'), so writers invalidating the resource also
+            invalidate its version
+
+    The in-memory cache only sees invalidations made in its own container,
+    so without CACHE_URL the version query always runs: a stale version
+    would answer 304 for data that has changed. An uncached version and
+    the handler's query share one pooled connection. Successful
+    responses get ETag (and Last-Modified) headers for the client to send back.
+
+    Usage:
+        @require_auth
+        @conditional_get('SELECT xmin::text AS version FROM pets WHERE "userId" = %(user_id)s')
+        def lambda_handler(event, context, user):
+            ...
+    """
+    cache_version = resource is not None and bool(CACHE_URL)
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context, user):
+            def load_version():
+                return execute_one(version_query, {'user_id': user['sub']})
+
+            # A cached version usually means the handler's data is cached too,
+            # so don't check out a connection that may go unused
+            with nullcontext() if cache_version else invocation_connection():
+                if cache_version:
+                    row = get_or_load(resource_key(resource, user['sub'], 'version'), load_version) or {}
+                else:
+                    row = load_version() or {}
+                etag = make_etag(row.get('version'))
+                last_modified = row.get('lastModified')
+                if isinstance(last_modified, str):
+                    # Round-tripped through a JSON cache backend
+                    last_modified = datetime.fromisoformat(last_modified)
+
+                if is_not_modified(event, etag, last_modified):
+                    return not_modified_response(etag, last_modified and format_http_date(last_modified))
+
+                response = handler(event, context, user)
+
+            if response.get('statusCode') == 200:
+                headers = dict(response.get('headers') or {})
+                headers['ETag'] = etag
+                if last_modified is not None:
+                    headers['Last-Modified'] = format_http_date(last_modified)
+                headers['Cache-Control'] = 'private, no-cache'
+                headers['Access-Control-Expose-Headers'] = 'ETag, Last-Modified'
+                response = dict(response, headers=headers)
+            return response
+        return wrapper
+    return decorator
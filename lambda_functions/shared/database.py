@@ -1,30 +1,244 @@
 """
 Shared database utilities for Lambda functions
 Uses psycopg2 for PostgreSQL connections with connection pooling
+
+The pool lives at module level so warm Lambda containers keep their
+connections between invocations instead of reconnecting for every query.
 """
 import os
+import functools
+import time
+import threading
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
+from .metrics import span, count
 
 # Database connection configuration
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Pool configuration
+POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', '2'))
+POOL_CHECKOUT_TIMEOUT = float(os.environ.get('DB_POOL_CHECKOUT_TIMEOUT', '5'))
+# Connections idle longer than this are pinged before reuse
+POOL_PING_AFTER = float(os.environ.get('DB_POOL_PING_AFTER', '30'))
+# Connections idle longer than this are assumed dropped by the server and replaced
+POOL_MAX_IDLE = float(os.environ.get('DB_POOL_MAX_IDLE', '300'))
+
+
+class InstrumentedCursor(RealDictCursor):
+    """RealDictCursor that reports query time, query count and rows returned to shared.metrics"""
+
+    def execute(self, query, vars=None):
+        with span('db'):
+            result = super().execute(query, vars)
+        count('queries')
+        if self.description is not None and self.rowcount > 0:
+            count('rows', self.rowcount)
+        return result
+
+
+class ConnectionPool:
+    """
+    Bounded pool of psycopg2 connections
+
+    Connections are health-checked on checkout: closed connections are
+    discarded, connections idle past `ping_after` are pinged with SELECT 1,
+    and connections idle past `max_idle` are replaced outright since the
+    server (or RDS Proxy / NAT) has most likely dropped them already.
+    """
+
+    def __init__(self, dsn, max_size=POOL_MAX_SIZE, checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                 ping_after=POOL_PING_AFTER, max_idle=POOL_MAX_IDLE):
+        self.dsn = dsn
+        self.max_size = max(1, max_size)
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self.max_idle = max_idle
+        self._idle = []  # list of (conn, released_at)
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn, cursor_factory=InstrumentedCursor)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, conn, idle_for):
+        """Check a connection taken from the idle list"""
+        if conn.closed:
+            return False
+        if idle_for >= self.max_idle:
+            return False
+        if idle_for >= self.ping_after:
+            try:
+                # A plain cursor, so the ping counts as checkout time rather than a query
+                with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                return False
+        return True
+
+    def getconn(self):
+        """
+        Check out a healthy connection, opening a new one if needed
+
+        Raises:
+            Exception: If the pool is exhausted for longer than checkout_timeout
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        with self._cond:
+            while not self._idle and self._in_use >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise Exception("Database connection pool exhausted")
+                self._cond.wait(remaining)
+
+            while self._idle:
+                conn, released_at = self._idle.pop()
+                if self._is_healthy(conn, time.monotonic() - released_at):
+                    self._in_use += 1
+                    return conn
+                self._discard(conn)
+
+            self._in_use += 1
+
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, dropping it if it is broken"""
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection (checked-out connections are closed on return)"""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_pool():
+    """Return the module-level pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DATABASE_URL)
+    return _pool
+
+
 @contextmanager
-def get_db_connection():
+def _checkout():
     """
-    Context manager for database connections
-    Automatically handles connection cleanup
+    Yield a raw pooled connection
+
+    Reuses the connection pinned by `invocation_connection()` when one is
+    active, otherwise borrows from the pool for the duration of the block.
     """
-    conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    pinned = getattr(_local, 'conn', None)
+    if pinned is not None:
+        yield pinned
+        return
+
+    pool = get_pool()
+    with span('connect'):
+        conn = pool.getconn()
+    broken = False
     try:
         yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
     finally:
-        conn.close()
+        pool.putconn(conn, discard=broken)
+
+
+@contextmanager
+def invocation_connection():
+    """
+    Borrow one connection for a whole Lambda invocation
+
+    Every execute_* call made inside the block runs on the same connection,
+    so a handler pays for a single checkout no matter how many queries it
+    issues. Each statement still commits on its own, as before.
+
+    Usage:
+        with invocation_connection():
+            user = execute_one(...)
+            execute_update(...)
+    """
+    if getattr(_local, 'conn', None) is not None:
+        yield _local.conn
+        return
+
+    with _checkout() as conn:
+        _local.conn = conn
+        try:
+            yield conn
+        finally:
+            _local.conn = None
+
+
+def with_invocation_connection(handler):
+    """
+    Decorator form of `invocation_connection()` for Lambda handlers
+
+    Usage:
+        @require_auth
+        @with_invocation_connection
+        def lambda_handler(event, context, user):
+            ...
+    """
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        with invocation_connection():
+            return handler(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def get_db_connection():
+    """
+    Context manager for database connections
+    Automatically commits on success and rolls back on error
+    """
+    with _checkout() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception as e:
+            if not conn.closed:
+                conn.rollback()
+            raise e
 
 def execute_query(query, params=None):
     """
@@ -37,7 +251,11 @@ def execute_query(query, params=None):
 
 def execute_one(query, params=None):
     """
-    Execute a SELECT query and return single result as dict
+    Execute a query and return single result as dict
+
+    Also runs the writable-CTE "command" statements in shared.commands,
+    which chain a handler's reads and writes in WITH clauses so the whole
+    unit of work costs one round trip and one commit.
     """
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
@@ -51,9 +269,7 @@ def execute_insert(query, params=None):
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(query + " RETURNING *", params or ())
-            result = cursor.fetchone()
-            conn.commit()
-            return result
+            return cursor.fetchone()
 
 def execute_update(query, params=None):
     """
@@ -62,6 +278,4 @@ def execute_update(query, params=None):
     with get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(query + " RETURNING *", params or ())
-            result = cursor.fetchone()
-            conn.commit()
-            return result
+            return cursor.fetchone()
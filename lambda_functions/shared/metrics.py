@@ -0,0 +1,209 @@
+"""
+Per-invocation metrics for Lambda functions
+
+@instrument wraps a handler and records, for each invocation, how long it
+spent in each phase (auth, connect, db, openai), how many queries it ran
+and rows they returned, whether it was a cold start, and the request and
+response payload sizes. Phases are timed with span(), which does nothing
+outside an instrumented invocation.
+
+Each invocation is written as one CloudWatch Embedded Metric Format (EMF)
+log line, which CloudWatch turns into metrics without any API calls. Set
+METRICS_SINK=off to disable, or use MemorySink to inspect records locally.
+"""
+import os
+import functools
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'AkoRangi/Lambda')
+METRICS_SINK = os.environ.get('METRICS_SINK', 'emf').lower()
+
+# Phases reported as "<phase>Ms" metrics even when they took no time
+PHASES = ('auth', 'connect', 'db', 'openai')
+
+_current = ContextVar('metrics_invocation', default=None)
+_cold_start = True
+_cold_start_lock = threading.Lock()
+
+
+class Invocation:
+    """Timings and counters collected during one handler invocation"""
+
+    def __init__(self, function_name, cold_start):
+        self.function_name = function_name
+        self.cold_start = cold_start
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.counts = {'queries': 0, 'rows': 0}
+        self.properties = {}
+        self._lock = threading.Lock()
+
+    def add_time(self, phase, ms):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + ms
+
+    def incr(self, name, n=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + n
+
+    def to_emf(self, duration_ms, timestamp_ms=None):
+        """Build the EMF record for this invocation"""
+        values = {'duration': duration_ms, 'coldStart': int(self.cold_start)}
+        units = {'duration': 'Milliseconds', 'coldStart': 'Count'}
+        for phase, ms in self.phases.items():
+            values[f"{phase}Ms"] = round(ms, 3)
+            units[f"{phase}Ms"] = 'Milliseconds'
+        for name, n in self.counts.items():
+            values[name] = n
+            units[name] = 'Bytes' if name.endswith('Bytes') else 'Count'
+
+        record = {
+            '_aws': {
+                'Timestamp': int(timestamp_ms if timestamp_ms is not None else time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['FunctionName']],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, unit in units.items()],
+                }],
+            },
+            'FunctionName': self.function_name,
+        }
+        record.update(values)
+        record.update(self.properties)
+        return record
+
+
+class StdoutSink:
+    """Write EMF records to stdout, where Lambda forwards them to CloudWatch Logs"""
+
+    def emit(self, record):
+        sys.stdout.write(json.dumps(record, separators=(',', ':')) + '\n')
+        sys.stdout.flush()
+
+
+class MemorySink:
+    """Keep EMF records in memory, for tests and local benchmarks"""
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    def emit(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+class NullSink:
+    def emit(self, record):
+        pass
+
+
+_sink = NullSink() if METRICS_SINK in ('off', 'none', '0', 'false') else StdoutSink()
+
+
+def set_sink(sink):
+    """Replace the sink records are emitted to; returns the previous one"""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def current():
+    """Return the active Invocation, or None outside an instrumented handler"""
+    return _current.get()
+
+
+@contextmanager
+def span(phase):
+    """
+    Add the time spent in the block to `phase` of the current invocation
+
+    Also usable as a decorator:
+        @span('auth')
+        def validate_token(token):
+            ...
+    """
+    invocation = _current.get()
+    if invocation is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        invocation.add_time(phase, (time.perf_counter() - start) * 1000)
+
+
+def count(name, n=1):
+    """Increment a counter of the current invocation"""
+    invocation = _current.get()
+    if invocation is not None:
+        invocation.incr(name, n)
+
+
+def _take_cold_start():
+    global _cold_start
+    with _cold_start_lock:
+        cold, _cold_start = _cold_start, False
+    return cold
+
+
+def _payload_bytes(body):
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    if isinstance(body, bytes):
+        return len(body)
+    return 0
+
+
+def instrument(handler):
+    """
+    Decorator that collects and emits metrics for each invocation
+
+    Put it outermost, so auth and response encoding are measured too.
+
+    Usage:
+        @instrument
+        @require_auth
+        def lambda_handler(event, context, user):
+            ...
+    """
+    @functools.wraps(handler)
+    def wrapper(event, context, *args, **kwargs):
+        name = getattr(context, 'function_name', None) or handler.__module__
+        invocation = Invocation(name, _take_cold_start())
+        request_id = getattr(context, 'aws_request_id', None)
+        if request_id:
+            invocation.properties['requestId'] = request_id
+        invocation.incr('requestBytes', _payload_bytes((event or {}).get('body')))
+
+        token = _current.set(invocation)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = handler(event, context, *args, **kwargs)
+            return response
+        except Exception:
+            invocation.properties['error'] = True
+            raise
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            _current.reset(token)
+            if isinstance(response, dict):
+                invocation.incr('responseBytes', _payload_bytes(response.get('body')))
+                if 'statusCode' in response:
+                    invocation.properties['statusCode'] = response['statusCode']
+            try:
+                _sink.emit(invocation.to_emf(duration_ms))
+            except Exception:
+                # Metrics must never fail a request
+                pass
+    return wrapper
@@ -0,0 +1,312 @@
+"""
+Resilient asyncio OpenAI client for Lambda functions
+Bounds every completion with a deadline, retries transient failures and
+fails fast while OpenAI is struggling
+
+All calls run on one background event loop per container, so the HTTP
+connection pool and the concurrency cap are shared by every caller
+(including worker threads) and survive warm invocations. Synchronous code
+uses complete_json(); async code can await ResilientOpenAI.complete_json().
+
+The OpenAI SDK is imported when the first client is built, so importing
+this module (e.g. for OpenAIUnavailable) stays cheap.
+"""
+import os
+import json
+import time
+import queue
+import random
+import asyncio
+import threading
+from .metrics import span
+
+# Per-attempt timeout and overall deadline, both well inside the 60s Lambda timeout
+OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT', '15'))
+OPENAI_DEADLINE = float(os.environ.get('OPENAI_DEADLINE', '25'))
+OPENAI_MAX_RETRIES = int(os.environ.get('OPENAI_MAX_RETRIES', '3'))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', '8'))
+# Circuit breaker: open after this many consecutive failures, retry after the cooldown
+OPENAI_BREAKER_THRESHOLD = int(os.environ.get('OPENAI_BREAKER_THRESHOLD', '5'))
+OPENAI_BREAKER_COOLDOWN = float(os.environ.get('OPENAI_BREAKER_COOLDOWN', '30'))
+RETRY_BACKOFF_BASE = 0.5
+DEFAULT_MODEL = "gpt-4o"
+
+
+class OpenAIUnavailable(Exception):
+    """Raised when OpenAI can't answer in time or the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After `threshold` failures in a row the breaker opens and calls fail
+    immediately for `cooldown` seconds. The first call after the cooldown
+    is let through as a trial (half-open); success closes the breaker.
+    """
+
+    def __init__(self, threshold=OPENAI_BREAKER_THRESHOLD, cooldown=OPENAI_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may be attempted now"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+def _is_retryable(error):
+    from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+    if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+class ResilientOpenAI:
+    """
+    AsyncOpenAI wrapper with a concurrency cap, deadlines, jittered retries
+    on 429/5xx and a circuit breaker
+
+    Must be used from a single event loop (see complete_json() below).
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=OPENAI_TIMEOUT, deadline=OPENAI_DEADLINE,
+                 max_retries=OPENAI_MAX_RETRIES, max_concurrency=OPENAI_MAX_CONCURRENCY, breaker=None):
+        from openai import AsyncOpenAI
+        # Retries are handled here so they respect the overall deadline
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0, timeout=timeout)
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _attempt(self, messages, model, timeout, **kwargs):
+        async with self._semaphore:
+            response = await self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                timeout=timeout,
+                **kwargs
+            )
+        return json.loads(response.choices[0].message.content)
+
+    async def complete_json(self, messages, model=DEFAULT_MODEL, deadline=None, **kwargs):
+        """
+        Run a JSON-mode chat completion and return the parsed object
+
+        Raises:
+            OpenAIUnavailable: If the breaker is open, the deadline passes or
+            retries are exhausted
+        """
+        if not self.breaker.allow():
+            raise OpenAIUnavailable("OpenAI is temporarily unavailable")
+
+        end = time.monotonic() + (deadline or self.deadline)
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = await asyncio.wait_for(
+                    self._attempt(messages, model, min(self.timeout, remaining), **kwargs),
+                    timeout=remaining
+                )
+                self.breaker.record_success()
+                return result
+            except Exception as e:
+                last_error = e
+                if not _is_retryable(e):
+                    # OpenAI answered (e.g. a 400), so it isn't down
+                    self.breaker.record_success()
+                    raise
+            if attempt < self.max_retries:
+                backoff = RETRY_BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+                await asyncio.sleep(min(backoff, max(0, end - time.monotonic())))
+
+        self.breaker.record_failure()
+        raise OpenAIUnavailable(f"OpenAI request failed: {last_error or 'deadline exceeded'}")
+
+    async def stream_text(self, messages, model=DEFAULT_MODEL, deadline=None, **kwargs):
+        """
+        Stream a JSON-mode chat completion, yielding content deltas
+
+        Opening the stream is retried like complete_json(); once tokens have
+        started arriving a failure is raised rather than retried, since the
+        caller may already have used them.
+
+        Raises:
+            OpenAIUnavailable: If the breaker is open, the deadline passes or
+            the stream can't be opened
+        """
+        if not self.breaker.allow():
+            raise OpenAIUnavailable("OpenAI is temporarily unavailable")
+
+        end = time.monotonic() + (deadline or self.deadline)
+        async with self._semaphore:
+            stream = None
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    stream = await asyncio.wait_for(
+                        self.client.chat.completions.create(
+                            model=model,
+                            messages=messages,
+                            response_format={"type": "json_object"},
+                            stream=True,
+                            timeout=min(self.timeout, remaining),
+                            **kwargs
+                        ),
+                        timeout=remaining
+                    )
+                    break
+                except Exception as e:
+                    last_error = e
+                    if not _is_retryable(e):
+                        self.breaker.record_success()
+                        raise
+                if attempt < self.max_retries:
+                    backoff = RETRY_BACKOFF_BASE * (2 ** attempt) * random.uniform(0.5, 1.5)
+                    await asyncio.sleep(min(backoff, max(0, end - time.monotonic())))
+
+            if stream is None:
+                self.breaker.record_failure()
+                raise OpenAIUnavailable(f"OpenAI request failed: {last_error or 'deadline exceeded'}")
+
+            try:
+                iterator = stream.__aiter__()
+                while True:
+                    remaining = end - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except Exception as e:
+                if _is_retryable(e):
+                    self.breaker.record_failure()
+                    raise OpenAIUnavailable(f"OpenAI stream failed: {e}")
+                raise
+            finally:
+                await stream.close()
+            self.breaker.record_success()
+
+
+_loop = None
+_client = None
+_lock = threading.Lock()
+
+
+def _get_loop():
+    """Start the background event loop thread on first use"""
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="openai-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def get_client():
+    """Return the shared ResilientOpenAI, creating it on the background loop"""
+    global _client
+    if _client is None:
+        loop = _get_loop()
+        with _lock:
+            if _client is None:
+                async def create():
+                    return ResilientOpenAI(
+                        api_key=os.environ.get('OPENAI_API_KEY'),
+                        base_url=os.environ.get('OPENAI_BASE_URL'),
+                    )
+                _client = asyncio.run_coroutine_threadsafe(create(), loop).result()
+    return _client
+
+
+@span('openai')
+def complete_json(messages, model=DEFAULT_MODEL, **kwargs):
+    """
+    Synchronous entry point for Lambda handlers
+
+    Returns:
+        dict: Parsed JSON completion
+
+    Raises:
+        OpenAIUnavailable: See ResilientOpenAI.complete_json()
+    """
+    client = get_client()
+    future = asyncio.run_coroutine_threadsafe(
+        client.complete_json(messages, model=model, **kwargs), _get_loop()
+    )
+    return future.result()
+
+
+_STREAM_END = object()
+
+
+def stream_text(messages, model=DEFAULT_MODEL, **kwargs):
+    """
+    Synchronous generator over a streamed completion's content deltas
+
+    Raises:
+        OpenAIUnavailable: See ResilientOpenAI.stream_text()
+    """
+    client = get_client()
+    chunks = queue.Queue()
+
+    async def pump():
+        try:
+            async for text in client.stream_text(messages, model=model, **kwargs):
+                chunks.put(text)
+        except BaseException as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_STREAM_END)
+
+    asyncio.run_coroutine_threadsafe(pump(), _get_loop())
+    while True:
+        # Only time spent waiting on OpenAI counts, not the caller's work between chunks
+        with span('openai'):
+            item = chunks.get()
+        if item is _STREAM_END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
@@ -3,27 +3,34 @@ OpenAI client utilities for Lambda functions
 Handles question generation and answer validation
 """
 import os
-import json
-from openai import OpenAI
+import time
+import uuid
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+from psycopg2.extras import Json
+from .database import execute_one, get_db_connection
+from .openai_async import complete_json, OpenAIUnavailable
+from .question_bank import validate_question
 
-client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+DIFFICULTY_PROMPT_MODIFIERS = {
+    'easy': "Make this question easier than typical for this year level. Use simple vocabulary and straightforward concepts.",
+    'medium': "Make this question at a typical difficulty level for this year.",
+    'hard': "Make this question more challenging than typical for this year level. Include multi-step thinking or advanced concepts.",
+}
 
-def generate_question(subject, year_level, topic=None):
+def question_prompts(subject, year_level, topic=None, difficulty=None, count=1):
     """
-    Generate a curriculum-aligned question using OpenAI GPT-5
+    Build the chat messages used to generate one question (or `count` questions)
     
-    Args:
-        subject: 'maths' or 'english'
-        year_level: 1-8 (NZ curriculum year levels)
-        topic: Optional specific topic
-        
     Returns:
-        dict: Question data with question, answer, type, options, etc.
+        list: System and user messages
     """
     system_prompt = f"""You are a New Zealand primary school teacher creating engaging practice questions 
     for Year {year_level} students. Generate questions aligned with the NZ curriculum.
     
-    Return JSON with this structure:
+    Return JSON with this structure (keep the keys in this order):
     {{
         "question": "The question text",
         "correctAnswer": "The correct answer",
@@ -35,31 +42,233 @@ def generate_question(subject, year_level, topic=None):
     }}
     """
     
-    user_prompt = f"Generate a Year {year_level} {subject} question"
+    if count > 1:
+        system_prompt += f"""
+    Generate {count} different questions and return them as {{"questions": [...]}},
+    where each item has the structure above.
+    """
+        user_prompt = f"Generate {count} different Year {year_level} {subject} questions"
+    else:
+        user_prompt = f"Generate a Year {year_level} {subject} question"
     if topic:
         user_prompt += f" about {topic}"
+    if difficulty in DIFFICULTY_PROMPT_MODIFIERS:
+        user_prompt += f". {DIFFICULTY_PROMPT_MODIFIERS[difficulty]}"
     
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        response_format={"type": "json_object"}
-    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def generate_question(subject, year_level, topic=None, difficulty=None):
+    """
+    Generate a curriculum-aligned question using OpenAI GPT-5
     
-    question_data = json.loads(response.choices[0].message.content)
+    Args:
+        subject: 'maths' or 'english'
+        year_level: 1-8 (NZ curriculum year levels)
+        topic: Optional specific topic
+        difficulty: Optional 'easy' | 'medium' | 'hard' (defaults to 'medium')
+        
+    Returns:
+        dict: Question data with question, answer, type, options, etc.
+        
+    Raises:
+        OpenAIUnavailable: If OpenAI times out or is failing
+    """
+    question_data = complete_json(question_prompts(subject, year_level, topic, difficulty))
     
     # Add unique ID
-    import uuid
     question_data['id'] = str(uuid.uuid4())
-    question_data['difficulty'] = 'medium'
+    question_data['difficulty'] = difficulty or 'medium'
     
     return question_data
 
+MAX_BATCH_SIZE = 10
+
+def generate_questions(subject, year_level, count, topic=None, difficulty=None):
+    """
+    Generate a set of questions in a single completion
+    
+    Args:
+        subject: 'maths' or 'english'
+        year_level: 1-8 (NZ curriculum year levels)
+        count: Number of questions wanted (1-MAX_BATCH_SIZE)
+        topic: Optional specific topic
+        difficulty: Optional 'easy' | 'medium' | 'hard' (defaults to 'medium')
+        
+    Returns:
+        list: Question dicts shaped like generate_question() output. Items
+        that fail schema validation are dropped, so fewer than `count` may
+        be returned.
+        
+    Raises:
+        OpenAIUnavailable: If OpenAI times out or is failing
+        Exception: If the completion contains no usable questions
+    """
+    count = max(1, min(count, MAX_BATCH_SIZE))
+    if count == 1:
+        items = [generate_question(subject, year_level, topic, difficulty)]
+    else:
+        data = complete_json(question_prompts(subject, year_level, topic, difficulty, count))
+        items = data.get('questions') if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise Exception("Completion did not contain a questions list")
+    
+    questions = []
+    seen = set()
+    for item in items[:count]:
+        if validate_question(item):
+            continue
+        text = ' '.join(str(item['question']).lower().split())
+        if text in seen:
+            continue
+        seen.add(text)
+        item['id'] = str(uuid.uuid4())
+        item['difficulty'] = difficulty or 'medium'
+        questions.append(item)
+    
+    if not questions:
+        raise Exception("Completion contained no valid questions")
+    return questions
+
+# Validation cache configuration
+VALIDATION_CACHE_TTL = int(os.environ.get('VALIDATION_CACHE_TTL', str(7 * 24 * 3600)))
+VALIDATION_CACHE_MEMORY_SIZE = int(os.environ.get('VALIDATION_CACHE_MEMORY_SIZE', '2048'))
+VALIDATION_CACHE_DB_MAX_ROWS = int(os.environ.get('VALIDATION_CACHE_DB_MAX_ROWS', '500000'))
+# Fraction of writes that also prune expired/excess rows from the shared table
+VALIDATION_CACHE_PRUNE_RATE = 0.01
+
+
+def is_valid_validation(result):
+    """True if a validation result has the fields questions/validate relies on"""
+    return (isinstance(result, dict)
+            and isinstance(result.get('isCorrect'), bool)
+            and isinstance(result.get('feedback'), str))
+
+
+class ValidationCache:
+    """
+    Two-tier cache of LLM answer validations
+
+    Tier 1 is an in-process LRU for warm containers, tier 2 is the shared
+    "validationCache" table so every container benefits from a result once
+    any of them has paid for it. Both tiers expire entries after `ttl`.
+    """
+
+    def __init__(self, ttl=VALIDATION_CACHE_TTL, memory_size=VALIDATION_CACHE_MEMORY_SIZE,
+                 db_max_rows=VALIDATION_CACHE_DB_MAX_ROWS):
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self.db_max_rows = db_max_rows
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(question, correct_answer, user_answer, subject):
+        """Hash of the normalized inputs (case and whitespace are ignored)"""
+        parts = [subject, question, correct_answer, user_answer]
+        normalized = '\x1f'.join(' '.join(str(p).lower().split()) for p in parts)
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def _put_memory(self, key, result, expires_at):
+        with self._lock:
+            self._entries[key] = (result, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.memory_size:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Return a cached result, checking memory first then Postgres"""
+        result = self._get_memory(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        try:
+            row = execute_one("""
+                SELECT result, EXTRACT(EPOCH FROM "expiresAt" - NOW()) AS "ttlLeft"
+                FROM "validationCache"
+                WHERE "cacheKey" = %s AND "expiresAt" > NOW()
+            """, (key,))
+        except Exception:
+            # The shared tier is best-effort
+            row = None
+
+        if row is None or not is_valid_validation(row['result']):
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self._put_memory(key, row['result'], time.time() + float(row['ttlLeft']))
+        return row['result']
+
+    def put(self, key, result):
+        """Store a result in both tiers; malformed results are never stored"""
+        if not is_valid_validation(result):
+            return
+        self._put_memory(key, result, time.time() + self.ttl)
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        INSERT INTO "validationCache" ("cacheKey", result, "expiresAt")
+                        VALUES (%s, %s, NOW() + %s * INTERVAL '1 second')
+                        ON CONFLICT ("cacheKey") DO UPDATE
+                        SET result = EXCLUDED.result, "createdAt" = NOW(), "expiresAt" = EXCLUDED."expiresAt"
+                    """, (key, Json(result), self.ttl))
+                    if random.random() < VALIDATION_CACHE_PRUNE_RATE:
+                        self._prune(cursor)
+        except Exception:
+            pass
+
+    def _prune(self, cursor):
+        """Drop expired rows and keep only the newest db_max_rows"""
+        cursor.execute('DELETE FROM "validationCache" WHERE "expiresAt" <= NOW()')
+        cursor.execute("""
+            DELETE FROM "validationCache"
+            WHERE "createdAt" < (
+                SELECT "createdAt" FROM "validationCache"
+                ORDER BY "createdAt" DESC
+                OFFSET %s LIMIT 1
+            )
+        """, (self.db_max_rows,))
+
+    def stats(self):
+        """Return hit counters for both tiers; every hit is an LLM call saved"""
+        hits = self.memory_hits + self.db_hits
+        total = hits + self.misses
+        return {
+            "memoryHits": self.memory_hits,
+            "dbHits": self.db_hits,
+            "misses": self.misses,
+            "hitRate": hits / total if total else 0.0,
+            "memorySize": len(self._entries),
+        }
+
+
+validation_cache = ValidationCache()
+
 def validate_answer(question, correct_answer, user_answer, subject):
     """
     Validate user's answer and provide feedback
+    Results are memoized in validation_cache, so identical answers to the
+    same question only reach OpenAI once
     
     Args:
         question: The question text
@@ -69,7 +278,16 @@ def validate_answer(question, correct_answer, user_answer, subject):
         
     Returns:
         dict: Validation result with isCorrect and feedback
+        
+    Raises:
+        OpenAIUnavailable: If OpenAI times out, is failing, or returns a
+            result without a boolean isCorrect and a feedback string
     """
+    cache_key = ValidationCache.make_key(question, correct_answer, user_answer, subject)
+    cached = validation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     system_prompt = f"""You are a supportive NZ primary school teacher providing feedback on student answers.
     Be encouraging and constructive.
     
@@ -88,13 +306,11 @@ Student Answer: {user_answer}
 Evaluate if the student's answer is correct (consider minor spelling/formatting variations for correct answers).
 Provide encouraging feedback."""
     
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        response_format={"type": "json_object"}
-    )
-    
-    return json.loads(response.choices[0].message.content)
+    result = complete_json([
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ])
+    if not is_valid_validation(result):
+        raise OpenAIUnavailable("OpenAI returned a malformed validation result")
+    validation_cache.put(cache_key, result)
+    return result
@@ -0,0 +1,55 @@
+"""
+Keyset pagination helpers for Lambda functions
+
+Cursors are opaque URL-safe tokens wrapping the sort key of the last row
+on a page, so the next page is a range scan on an index instead of an
+OFFSET that gets slower as history grows.
+"""
+import json
+import base64
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(*values):
+    """Encode sort-key values (datetimes become ISO strings) into a cursor token"""
+    plain = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(plain, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token back into its list of values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse a `limit` query parameter
+
+    Raises:
+        ValueError: If the value isn't an integer between 1 and `maximum`
+    """
+    if value in (None, ''):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit. Must be between 1 and {maximum}")
+    if not (1 <= size <= maximum):
+        raise ValueError(f"Invalid limit. Must be between 1 and {maximum}")
+    return size
@@ -0,0 +1,224 @@
+"""
+Pre-generated question bank for Lambda functions
+
+Questions are indexed by (subject, yearLevel, topic, difficulty) so a
+practice session can be served from Postgres in milliseconds instead of
+waiting on a live OpenAI completion. Each user's served questions are
+recorded so nobody gets the same question twice.
+"""
+import hashlib
+from psycopg2.extras import Json
+from .database import execute_one, execute_query, invocation_connection
+
+DEFAULT_DIFFICULTY = 'medium'
+QUESTION_TYPES = ['text', 'multiple_choice', 'fill_blank', 'word_problem']
+
+PICK_QUESTION_SQL = """
+    WITH picked AS (
+        SELECT qb.*
+        FROM "questionBank" qb
+        WHERE qb.subject = %(subject)s
+          AND qb."yearLevel" = %(year_level)s
+          AND qb.difficulty = %(difficulty)s
+          AND (%(topic)s = '' OR qb.topic = %(topic)s)
+          AND NOT EXISTS (
+              SELECT 1 FROM "userSeenQuestions" s
+              WHERE s."userId" = %(user_id)s AND s."questionId" = qb.id
+          )
+          -- Already waiting in the session's queue (not yet marked seen)
+          AND NOT EXISTS (
+              SELECT 1 FROM "sessionQuestionQueue" q
+              WHERE q."sessionId" = %(session_id)s AND q.question->>'id' = qb.id
+          )
+        ORDER BY random()
+        LIMIT %(limit)s
+    ), seen AS (
+        INSERT INTO "userSeenQuestions" ("userId", "questionId")
+        SELECT %(user_id)s, id FROM picked
+        WHERE %(mark_seen)s
+        ON CONFLICT DO NOTHING
+    )
+    SELECT * FROM picked
+"""
+
+SAVE_QUESTION_SQL = """
+    WITH saved AS (
+        INSERT INTO "questionBank"
+        (id, subject, "yearLevel", topic, difficulty, question, "correctAnswer",
+         type, options, hint, explanation, "contentHash")
+        VALUES (%(id)s, %(subject)s, %(year_level)s, %(topic)s, %(difficulty)s, %(question)s,
+                %(correct_answer)s, %(type)s, %(options)s, %(hint)s, %(explanation)s, %(content_hash)s)
+        ON CONFLICT ("contentHash") DO NOTHING
+        RETURNING id
+    ), seen AS (
+        INSERT INTO "userSeenQuestions" ("userId", "questionId")
+        SELECT %(user_id)s, id FROM saved
+        WHERE %(user_id)s IS NOT NULL
+        ON CONFLICT DO NOTHING
+    )
+    SELECT id FROM saved
+"""
+
+
+def normalize_topic(topic):
+    """Topics are stored lower-cased so lookups are case-insensitive ('' = any)"""
+    return (topic or '').strip().lower()
+
+
+def content_hash(subject, year_level, question_text):
+    """Stable hash used to de-duplicate questions in the bank"""
+    normalized = ' '.join(question_text.lower().split())
+    key = f"{subject}|{year_level}|{normalized}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _to_question(row):
+    """Shape a bank row like the output of generate_question()"""
+    question = {
+        "id": row['id'],
+        "question": row['question'],
+        "correctAnswer": row['correctAnswer'],
+        "type": row['type'],
+        "topic": row['topic'],
+        "hint": row['hint'],
+        "explanation": row['explanation'],
+        "difficulty": row['difficulty'],
+    }
+    if row.get('options') is not None:
+        question['options'] = row['options']
+    return question
+
+
+def get_questions(user_id, subject, year_level, topic=None, difficulty=DEFAULT_DIFFICULTY, limit=1,
+                  session_id=None):
+    """
+    Serve up to `limit` banked questions the user hasn't seen yet
+
+    Args:
+        user_id: Auth0 user ID (used for per-user de-duplication)
+        subject: 'maths' or 'english'
+        year_level: 1-8 (NZ curriculum year levels)
+        topic: Optional specific topic (any topic when omitted)
+        difficulty: 'easy', 'medium' or 'hard'
+        limit: Maximum number of questions to return
+        session_id: When picking for a session's queue: skip questions
+            already queued for it, and leave marking them seen to the pop
+            (shared.session_queue), since a queued question may never be served
+
+    Returns:
+        list: Question data (empty if the bank has nothing suitable)
+    """
+    rows = execute_query(PICK_QUESTION_SQL, {
+        'user_id': user_id,
+        'subject': subject,
+        'year_level': year_level,
+        'topic': normalize_topic(topic),
+        'difficulty': difficulty or DEFAULT_DIFFICULTY,
+        'limit': limit,
+        'session_id': session_id,
+        'mark_seen': session_id is None,
+    })
+    return [_to_question(row) for row in rows]
+
+
+def get_question(user_id, subject, year_level, topic=None, difficulty=DEFAULT_DIFFICULTY):
+    """
+    Serve one banked question the user hasn't seen yet
+
+    Returns:
+        dict or None: Question data, or None if the bank has nothing suitable
+    """
+    questions = get_questions(user_id, subject, year_level, topic, difficulty, limit=1)
+    return questions[0] if questions else None
+
+
+def save_question(question, subject, year_level, difficulty=None, user_id=None, topic=None):
+    """
+    Write a generated question back into the bank
+
+    Duplicates (by content hash) are ignored. When `user_id` is given the
+    question is also marked as seen by that user. `topic` overrides the
+    model's own topic label so the question is filed under what was asked for.
+
+    Returns:
+        str or None: The bank ID, or None if the question was a duplicate
+    """
+    row = execute_one(SAVE_QUESTION_SQL, {
+        'id': question['id'],
+        'subject': subject,
+        'year_level': year_level,
+        'topic': normalize_topic(topic or question.get('topic')),
+        'difficulty': difficulty or question.get('difficulty') or DEFAULT_DIFFICULTY,
+        'question': question['question'],
+        'correct_answer': str(question['correctAnswer']),
+        'type': question.get('type') or 'text',
+        'options': Json(question['options']) if question.get('options') else None,
+        'hint': question.get('hint'),
+        'explanation': question.get('explanation'),
+        'content_hash': content_hash(subject, year_level, question['question']),
+        'user_id': user_id,
+    })
+    return row['id'] if row else None
+
+
+def validate_question(data):
+    """
+    Check a generated question against the expected JSON structure
+
+    Returns:
+        list: Problems found (empty if the question is usable)
+    """
+    if not isinstance(data, dict):
+        return ["question is not an object"]
+
+    problems = []
+    for field in ('question', 'correctAnswer'):
+        value = data.get(field)
+        if not isinstance(value, (str, int, float)) or not str(value).strip():
+            problems.append(f"missing {field}")
+
+    question_type = data.get('type')
+    if question_type not in QUESTION_TYPES:
+        problems.append(f"invalid type {question_type!r}")
+
+    if question_type == 'multiple_choice':
+        options = data.get('options')
+        if not isinstance(options, list) or len(options) < 2:
+            problems.append("multiple_choice needs at least two options")
+        elif str(data.get('correctAnswer')) not in [str(o) for o in options]:
+            problems.append("correctAnswer is not one of the options")
+
+    for field in ('topic', 'hint', 'explanation'):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            problems.append(f"{field} must be a string")
+
+    return problems
+
+
+def list_questions(subject, year_level, topic, difficulty=DEFAULT_DIFFICULTY):
+    """
+    Return the question texts already banked for one index cell
+
+    Returns:
+        list: Question strings
+    """
+    rows = execute_query("""
+        SELECT question FROM "questionBank"
+        WHERE subject = %s AND "yearLevel" = %s AND topic = %s AND difficulty = %s
+    """, (subject, year_level, normalize_topic(topic), difficulty))
+    return [row['question'] for row in rows]
+
+
+def save_questions(questions, subject, year_level, difficulty=None, user_id=None, topic=None):
+    """
+    Write several generated questions back into the bank on one connection
+
+    Returns:
+        int: Number of questions that were new to the bank
+    """
+    saved = 0
+    with invocation_connection():
+        for question in questions:
+            if save_question(question, subject, year_level, difficulty, user_id, topic):
+                saved += 1
+    return saved
@@ -0,0 +1,146 @@
+"""
+Streaming question generation for Lambda functions
+Emits each field of a generated question as soon as the model finishes it
+
+The model is asked for the same JSON object as generate_question(), with
+"question" first, so a child can start reading while the hint and
+explanation are still being written. The finished question is written
+back to the question bank like a live generate_question() result.
+"""
+import json
+import uuid
+from .openai_client import question_prompts
+from .openai_async import stream_text, OpenAIUnavailable
+from .question_bank import save_question, validate_question
+
+
+class IncrementalJSONFields:
+    """
+    Incremental parser for the top-level fields of a streamed JSON object
+
+    feed() accepts arbitrary text chunks and returns the (key, value) pairs
+    whose values became complete in that chunk. Nested objects and arrays
+    are returned whole once they close.
+    """
+
+    def __init__(self):
+        self.buf = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expecting = 'object'  # object, key, colon, value, comma
+        self.key = None
+        self.token_start = None
+        self.value_is_string = False
+        self.done = False
+
+    def _complete(self, end):
+        value = json.loads(self.buf[self.token_start:end])
+        self.token_start = None
+        self.expecting = 'comma'
+        return (self.key, value)
+
+    def feed(self, chunk):
+        self.buf += chunk
+        fields = []
+        while self.pos < len(self.buf) and not self.done:
+            i = self.pos
+            c = self.buf[i]
+            self.pos += 1
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        if self.expecting == 'key':
+                            self.key = json.loads(self.buf[self.token_start:i + 1])
+                            self.token_start = None
+                            self.expecting = 'colon'
+                        elif self.expecting == 'value' and self.value_is_string:
+                            fields.append(self._complete(i + 1))
+                continue
+
+            if c.isspace():
+                continue
+
+            if self.depth == 1 and self.expecting == 'value' and self.token_start is not None \
+                    and not self.value_is_string and c in ',}':
+                # End of a number / true / false / null
+                fields.append(self._complete(i))
+
+            if c == '"':
+                self.in_string = True
+                if self.depth == 1 and self.expecting in ('key', 'value') and self.token_start is None:
+                    self.token_start = i
+                    self.value_is_string = self.expecting == 'value'
+            elif c in '{[':
+                if self.depth == 0 and c == '{':
+                    self.expecting = 'key'
+                elif self.depth == 1 and self.expecting == 'value' and self.token_start is None:
+                    self.token_start = i
+                    self.value_is_string = False
+                self.depth += 1
+            elif c in '}]':
+                self.depth -= 1
+                if self.depth == 1 and self.expecting == 'value' and self.token_start is not None:
+                    fields.append(self._complete(i + 1))
+                elif self.depth == 0:
+                    self.done = True
+            elif self.depth == 1:
+                if c == ':' and self.expecting == 'colon':
+                    self.expecting = 'value'
+                elif c == ',' and self.expecting in ('comma', 'value'):
+                    self.expecting = 'key'
+                elif self.expecting == 'value' and self.token_start is None:
+                    self.token_start = i
+                    self.value_is_string = False
+        return fields
+
+
+def stream_question(subject, year_level, topic=None, difficulty=None, user_id=None):
+    """
+    Generate a question, yielding each field as soon as it is complete
+
+    Once the object closes the question is validated and, if well formed,
+    saved to the bank (marked seen by `user_id`).
+
+    Yields:
+        tuple: ('field', {"name": key, "value": value}) for every top-level
+        field as it completes, then ('done', question) with the full
+        question (including id and difficulty) once the object closes
+
+    Raises:
+        OpenAIUnavailable: If OpenAI times out, is failing, or the stream
+            ends before the object closes
+    """
+    parser = IncrementalJSONFields()
+    question_data = {}
+    for chunk in stream_text(question_prompts(subject, year_level, topic, difficulty)):
+        for key, value in parser.feed(chunk):
+            question_data[key] = value
+            yield 'field', {"name": key, "value": value}
+        if parser.done:
+            break
+
+    if not parser.done:
+        raise OpenAIUnavailable("OpenAI stream ended before the question was complete")
+
+    question_data['id'] = str(uuid.uuid4())
+    question_data['difficulty'] = difficulty or 'medium'
+    if not validate_question(question_data):
+        try:
+            save_question(question_data, subject, year_level, difficulty, user_id=user_id, topic=topic)
+        except Exception:
+            # A failed write-back only costs a future cache miss
+            pass
+    yield 'done', question_data
+
+
+def format_sse(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -1,7 +1,59 @@
 """
 Standardized HTTP response utilities for Lambda functions
+
+Bodies are encoded with orjson when it is installed, falling back to the
+standard library. Both backends accept database rows as they come back
+from RealDictCursor, including datetime, date, Decimal and UUID values.
 """
+import os
+import functools
 import json
+import gzip
+import uuid
+import base64
+from decimal import Decimal
+from datetime import date, datetime, time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Force a backend with JSON_ENCODER=json or JSON_ENCODER=orjson
+JSON_ENCODER = os.environ.get('JSON_ENCODER') or ('orjson' if orjson else 'json')
+# Responses at least this large are compressed when the client accepts it
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '').lower() in ('1', 'true', 'yes')
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+
+def json_default(obj):
+    """Encode the non-JSON types psycopg2 returns"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_json(data):
+    return json.dumps(data, default=json_default)
+
+
+def _dumps_orjson(data):
+    return orjson.dumps(data, default=json_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+ENCODERS = {'json': _dumps_json}
+if orjson:
+    ENCODERS['orjson'] = _dumps_orjson
+
+
+def dumps(data):
+    """Encode a response body with the configured backend"""
+    return ENCODERS[JSON_ENCODER](data)
+
 
 def success_response(data, status_code=200):
     """Return a successful JSON response"""
@@ -12,7 +64,7 @@ def success_response(data, status_code=200):
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Credentials": "true"
         },
-        "body": json.dumps(data)
+        "body": dumps(data)
     }
 
 def error_response(message, status_code=400):
@@ -23,7 +75,7 @@ def error_response(message, status_code=400):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*"
         },
-        "body": json.dumps({"message": message})
+        "body": dumps({"message": message})
     }
 
 def unauthorized_response(message="Unauthorized"):
@@ -37,3 +89,91 @@ def not_found_response(message="Not found"):
 def server_error_response(message="Internal server error"):
     """Return a 500 Internal Server Error response"""
     return error_response(message, 500)
+
+def not_modified_response(etag, last_modified=None):
+    """Return a bodiless 304 Not Modified response"""
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Expose-Headers": "ETag, Last-Modified"
+    }
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return {
+        "statusCode": 304,
+        "headers": headers,
+        "body": ""
+    }
+
+
+def _accepted_encodings(event):
+    headers = (event or {}).get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == 'accept-encoding':
+            return {part.split(';')[0].strip().lower() for part in (value or '').split(',')}
+    return set()
+
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def compress(response, event, min_bytes=RESPONSE_COMPRESSION_MIN_BYTES):
+    """
+    Compress a response body with br or gzip if the client accepts it
+
+    Bodies smaller than `min_bytes`, or already base64-encoded, are left
+    alone. br is only used when the brotli package is installed.
+
+    Returns:
+        dict: The response, with a base64 body and Content-Encoding if compressed
+    """
+    body = response.get('body')
+    if not body or response.get('isBase64Encoded'):
+        return response
+    raw = body.encode('utf-8')
+    if len(raw) < min_bytes:
+        return response
+
+    accepted = _accepted_encodings(event)
+    brotli = _brotli() if 'br' in accepted else None
+    if brotli:
+        encoding, compressed = 'br', brotli.compress(raw)
+    elif 'gzip' in accepted:
+        encoding, compressed = 'gzip', gzip.compress(raw, compresslevel=6)
+    else:
+        return response
+
+    headers = dict(response.get('headers') or {})
+    headers['Content-Encoding'] = encoding
+    headers['Vary'] = 'Accept-Encoding'
+    return dict(response, headers=headers, body=base64.b64encode(compressed).decode('ascii'),
+                isBase64Encoded=True)
+
+
+def compress_response(handler):
+    """
+    Decorator that compresses large responses when RESPONSE_COMPRESSION is on
+
+    Needs an API that decodes base64 bodies for the client: an HTTP API,
+    a function URL, or a REST API with binary media types configured.
+
+    Usage:
+        @compress_response
+        @require_auth
+        def lambda_handler(event, context, user):
+            ...
+    """
+    @functools.wraps(handler)
+    def wrapper(event, *args, **kwargs):
+        response = handler(event, *args, **kwargs)
+        if RESPONSE_COMPRESSION:
+            return compress(response, event)
+        return response
+    return wrapper
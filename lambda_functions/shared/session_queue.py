@@ -0,0 +1,198 @@
+"""
+Per-session question queue for Lambda functions
+Prepares a practice session's next questions in the background so serving
+"next question" is a single indexed pop
+
+Questions come from the question bank first and are topped up with one
+batch completion. The queue is refilled whenever it drops below the
+low-water mark; "practiceSessions"."refillingAt" lets only one refill per
+session run at a time. A question is marked seen by the user when it is
+popped, not when it is queued.
+"""
+import os
+import json
+import threading
+from psycopg2.extras import Json, execute_values
+from .database import execute_one, get_db_connection
+from .openai_client import generate_questions
+from .question_bank import get_questions, save_questions
+
+# Questions prepared per fill, and the queue length that triggers a refill
+PREFETCH_COUNT = int(os.environ.get('PREFETCH_COUNT', '5'))
+PREFETCH_LOW_WATER = int(os.environ.get('PREFETCH_LOW_WATER', '2'))
+# Worker Lambda invoked asynchronously; without it, prefetch runs in a local thread
+PREFETCH_FUNCTION_NAME = os.environ.get('PREFETCH_FUNCTION_NAME')
+# A refill that hasn't finished after this many seconds is assumed dead
+# (longer than the prefetch worker's timeout)
+REFILL_TIMEOUT = 120
+
+CLAIM_REFILL_SQL = f"""
+    UPDATE "practiceSessions"
+    SET "refillingAt" = NOW()
+    WHERE id = %s
+      AND ("refillingAt" IS NULL OR "refillingAt" < NOW() - INTERVAL '{REFILL_TIMEOUT} seconds')
+    RETURNING id
+"""
+
+POP_QUESTION_SQL = """
+    WITH session AS (
+        SELECT ps.id, ps."userId", ps.subject, ps."yearLevel",
+               COALESCE(CASE WHEN ps.subject = 'maths' THEN u."mathsDifficulty"
+                             ELSE u."englishDifficulty" END, 'medium') AS difficulty
+        FROM "practiceSessions" ps
+        JOIN users u ON u.id = ps."userId"
+        WHERE ps.id = %(session_id)s AND ps."userId" = %(user_id)s
+    ), next AS (
+        SELECT q.id
+        FROM "sessionQuestionQueue" q
+        WHERE q."sessionId" = %(session_id)s AND EXISTS (SELECT 1 FROM session)
+        ORDER BY q.id
+        LIMIT 1
+        FOR UPDATE OF q SKIP LOCKED
+    ), popped AS (
+        DELETE FROM "sessionQuestionQueue" q
+        USING next
+        WHERE q.id = next.id
+        RETURNING q.question
+    ), seen AS (
+        -- Generated questions that were duplicates never made it into the bank
+        INSERT INTO "userSeenQuestions" ("userId", "questionId")
+        SELECT %(user_id)s, qb.id
+        FROM popped
+        JOIN "questionBank" qb ON qb.id = popped.question->>'id'
+        ON CONFLICT DO NOTHING
+    )
+    SELECT session.*,
+           (SELECT question FROM popped) AS question,
+           (SELECT COUNT(*) FROM "sessionQuestionQueue" q WHERE q."sessionId" = session.id)
+               - (SELECT COUNT(*) FROM popped) AS remaining
+    FROM session
+"""
+
+
+def queue_length(session_id):
+    row = execute_one(
+        'SELECT COUNT(*) AS remaining FROM "sessionQuestionQueue" WHERE "sessionId" = %s',
+        (session_id,)
+    )
+    return row['remaining']
+
+
+def claim_refill(session_id):
+    """
+    Mark a session's queue as being refilled
+
+    Returns:
+        bool: False if another refill is already running for the session
+    """
+    return execute_one(CLAIM_REFILL_SQL, (session_id,)) is not None
+
+
+def release_refill(session_id):
+    execute_one(
+        'UPDATE "practiceSessions" SET "refillingAt" = NULL WHERE id = %s RETURNING id',
+        (session_id,)
+    )
+
+
+def fill_queue(session_id, user_id, subject, year_level, difficulty='medium', target=PREFETCH_COUNT):
+    """
+    Top up a session's queue to `target` questions
+
+    Releases the refill claimed by enqueue_prefetch() when done, whether
+    or not it succeeded.
+
+    Returns:
+        int: Number of questions added
+    """
+    try:
+        missing = target - queue_length(session_id)
+        if missing <= 0:
+            return 0
+
+        questions = get_questions(user_id, subject, year_level, None, difficulty, limit=missing,
+                                  session_id=session_id)
+        if len(questions) < missing:
+            generated = generate_questions(subject, year_level, missing - len(questions), None, difficulty)
+            try:
+                save_questions(generated, subject, year_level, difficulty)
+            except Exception:
+                pass
+            questions.extend(generated)
+
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    'INSERT INTO "sessionQuestionQueue" ("sessionId", question) VALUES %s',
+                    [(session_id, Json(q)) for q in questions]
+                )
+        return len(questions)
+    finally:
+        release_refill(session_id)
+
+
+def enqueue_prefetch(session_id, user_id, subject, year_level, difficulty='medium', target=PREFETCH_COUNT):
+    """
+    Start background preparation of a session's next questions
+
+    Invokes the prefetch worker Lambda asynchronously when
+    PREFETCH_FUNCTION_NAME is set, otherwise fills the queue on a daemon
+    thread (for local development). Does nothing if a refill is already
+    running for the session.
+
+    Returns:
+        bool: True if a refill was started
+    """
+    if not claim_refill(session_id):
+        return False
+
+    payload = {
+        "sessionId": session_id,
+        "userId": user_id,
+        "subject": subject,
+        "yearLevel": year_level,
+        "difficulty": difficulty,
+        "target": target,
+    }
+
+    if PREFETCH_FUNCTION_NAME:
+        import boto3
+        try:
+            boto3.client('lambda').invoke(
+                FunctionName=PREFETCH_FUNCTION_NAME,
+                InvocationType='Event',
+                Payload=json.dumps(payload).encode('utf-8')
+            )
+        except Exception:
+            release_refill(session_id)
+            raise
+        return True
+
+    def run():
+        try:
+            fill_queue(session_id, user_id, subject, year_level, difficulty, target)
+        except Exception:
+            pass
+    threading.Thread(target=run, daemon=True).start()
+    return True
+
+
+def pop_question(session_id, user_id):
+    """
+    Take the next prepared question for a session, refilling below the low-water mark
+
+    Returns:
+        tuple: (session, question) - session is None if it doesn't belong to
+        the user; question is None if the queue was empty
+    """
+    row = execute_one(POP_QUESTION_SQL, {'session_id': session_id, 'user_id': user_id})
+    if not row:
+        return None, None
+
+    question = row.pop('question')
+    remaining = row.pop('remaining')
+    if remaining < PREFETCH_LOW_WATER:
+        enqueue_prefetch(session_id, user_id, row['subject'], row['yearLevel'], row['difficulty'])
+
+    return row, question
@@ -0,0 +1,106 @@
+"""
+Incrementally maintained per-user subject statistics for Lambda functions
+
+"userSubjectStats" holds one row per (user, subject) that is updated as
+answers are recorded and sessions complete, so reading a student's stats
+is a single primary-key lookup instead of a scan of their whole history.
+"""
+from .database import execute_one
+
+# Number of recent session accuracies kept for the rolling accuracy
+RECENT_SESSIONS_WINDOW = 5
+POINTS_PER_CORRECT_ANSWER = 10
+
+# Index of the ring slot the next session overwrites
+_RING_SLOT = f'2 * mod(st."recentSessionCount", {RECENT_SESSIONS_WINDOW})'
+
+# CTE fragment for shared.commands: expects a `completed` CTE exposing
+# "userId", subject, "questionsAttempted" and "questionsCorrect"
+COMPLETE_SESSION_STATS_CTE = f"""
+    session_stats AS (
+        INSERT INTO "userSubjectStats" AS st ("userId", subject, sessions, "recentAccuracies", "rollingAccuracy",
+                                              "recentCounts", "recentSessionCount")
+        SELECT c."userId", c.subject, 1,
+               CASE WHEN c."questionsAttempted" > 0
+                    THEN ARRAY[ROUND(100.0 * c."questionsCorrect" / c."questionsAttempted")::INTEGER]
+                    ELSE '{{}}'::INTEGER[] END,
+               CASE WHEN c."questionsAttempted" > 0
+                    THEN ROUND(100.0 * c."questionsCorrect" / c."questionsAttempted")::INTEGER END,
+               CASE WHEN c."questionsAttempted" > 0
+                    THEN ARRAY[c."questionsAttempted", COALESCE(c."questionsCorrect", 0)]
+                         || array_fill(0, ARRAY[{2 * (RECENT_SESSIONS_WINDOW - 1)}])
+                    ELSE array_fill(0, ARRAY[{2 * RECENT_SESSIONS_WINDOW}]) END,
+               CASE WHEN c."questionsAttempted" > 0 THEN 1 ELSE 0 END
+        FROM completed c
+        ON CONFLICT ("userId", subject) DO UPDATE
+        SET sessions = st.sessions + 1,
+            "recentAccuracies" = (st."recentAccuracies" || EXCLUDED."recentAccuracies")[
+                GREATEST(cardinality(st."recentAccuracies" || EXCLUDED."recentAccuracies") - {RECENT_SESSIONS_WINDOW} + 1, 1):
+            ],
+            "rollingAccuracy" = COALESCE((
+                SELECT ROUND(AVG(a))::INTEGER
+                FROM unnest((st."recentAccuracies" || EXCLUDED."recentAccuracies")[
+                    GREATEST(cardinality(st."recentAccuracies" || EXCLUDED."recentAccuracies") - {RECENT_SESSIONS_WINDOW} + 1, 1):
+                ]) AS a
+            ), st."rollingAccuracy"),
+            -- Overwrite the oldest ring slot (see shared.adaptive)
+            "recentCounts"[{_RING_SLOT} + 1] = CASE WHEN EXCLUDED."recentSessionCount" > 0
+                                             THEN EXCLUDED."recentCounts"[1]
+                                             ELSE st."recentCounts"[{_RING_SLOT} + 1] END,
+            "recentCounts"[{_RING_SLOT} + 2] = CASE WHEN EXCLUDED."recentSessionCount" > 0
+                                             THEN EXCLUDED."recentCounts"[2]
+                                             ELSE st."recentCounts"[{_RING_SLOT} + 2] END,
+            "recentSessionCount" = st."recentSessionCount" + EXCLUDED."recentSessionCount",
+            "updatedAt" = NOW()
+        RETURNING st.subject, st."rollingAccuracy", st."recentCounts", st."recentSessionCount"
+    )
+"""
+
+STUDENT_STATS_SQL = """
+    SELECT u.id, u."firstName", u."lastName", u."yearLevel", u."totalPoints",
+           u."currentStreak", u."longestStreak", u."mathsDifficulty", u."englishDifficulty",
+           (u.id = %(viewer_id)s OR EXISTS (
+               SELECT 1 FROM "studentLinks" l
+               WHERE l."supervisorId" = %(viewer_id)s AND l."studentId" = u.id
+                 AND l.status = 'approved'
+           )) AS "isAuthorized",
+           (SELECT COALESCE(json_object_agg(st.subject, json_build_object(
+                'totalSessions', st.sessions,
+                'totalQuestions', st.attempts,
+                'correctAnswers', st.correct,
+                'accuracy', CASE WHEN st.attempts > 0
+                                 THEN ROUND(100.0 * st.correct / st.attempts)::INTEGER ELSE 0 END,
+                'rollingAccuracy', st."rollingAccuracy",
+                'recentAccuracies', st."recentAccuracies"
+            )), '{}'::json)
+            FROM "userSubjectStats" st WHERE st."userId" = u.id) AS subjects,
+           (SELECT COALESCE(json_agg(r), '[]'::json) FROM (
+                SELECT id, subject, "yearLevel", "questionsAttempted", "questionsCorrect",
+                       "pointsEarned", "startedAt", "completedAt"
+                FROM "practiceSessions"
+                WHERE "userId" = u.id
+                ORDER BY "startedAt" DESC, id DESC
+                LIMIT 10
+            ) r) AS "recentSessions"
+    FROM users u
+    WHERE u.id = %(student_id)s
+"""
+
+EMPTY_SUBJECT_STATS = {
+    "totalSessions": 0,
+    "totalQuestions": 0,
+    "correctAnswers": 0,
+    "accuracy": 0,
+    "rollingAccuracy": None,
+    "recentAccuracies": [],
+}
+
+
+def get_student_stats(viewer_id, student_id):
+    """
+    Read a student's profile, per-subject stats and recent sessions in one query
+
+    Returns:
+        dict or None: Row with isAuthorized flag, or None if the student doesn't exist
+    """
+    return execute_one(STUDENT_STATS_SQL, {'viewer_id': viewer_id, 'student_id': student_id})
@@ -3,8 +3,10 @@ Lambda function: Create student-teacher/parent link
 Equivalent to: POST /api/student-links
 """
 import json
-from shared import require_auth, execute_insert, execute_one, success_response, error_response
+from shared import instrument, require_auth, success_response, error_response
+from shared.commands import create_student_link
 
+@instrument
 @require_auth
 def lambda_handler(event, context, user):
     """
@@ -27,43 +29,22 @@ def lambda_handler(event, context, user):
         
         supervisor_id = user['sub']
         
-        # Verify supervisor is parent or teacher
-        supervisor_query = "SELECT role FROM users WHERE id = %s"
-        supervisor = execute_one(supervisor_query, (supervisor_id,))
+        # Verify roles, check for an existing link and create it in a single statement
+        result = create_student_link(supervisor_id, student_email)
         
-        if not supervisor or supervisor['role'] not in ['parent', 'teacher']:
+        if result['supervisorRole'] not in ['parent', 'teacher']:
             return error_response("Only parents and teachers can link to students", 403)
         
-        # Find student by email
-        student_query = "SELECT id, role FROM users WHERE email = %s"
-        student = execute_one(student_query, (student_email,))
-        
-        if not student:
+        if not result['studentRole']:
             return error_response("Student not found", 404)
         
-        if student['role'] != 'student':
+        if result['studentRole'] != 'student':
             return error_response("User is not a student", 400)
         
-        student_id = student['id']
-        
-        # Check if link already exists
-        existing_query = """
-            SELECT id FROM "studentLinks"
-            WHERE "supervisorId" = %s AND "studentId" = %s
-        """
-        existing = execute_one(existing_query, (supervisor_id, student_id))
-        
-        if existing:
+        if result['linkExists']:
             return error_response("Link already exists", 400)
         
-        # Create link (pending approval)
-        insert_query = """
-            INSERT INTO "studentLinks"
-            ("supervisorId", "studentId", status)
-            VALUES (%s, %s, %s)
-        """
-        
-        link = execute_insert(insert_query, (supervisor_id, student_id, 'pending'))
+        link = result['link']
         
         return success_response(dict(link), 201)
         
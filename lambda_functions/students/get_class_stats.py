@@ -0,0 +1,145 @@
+"""
+Lambda function: Get stats for every student linked to the caller
+Equivalent to: GET /api/student-links/stats
+"""
+import os
+from datetime import datetime, timedelta
+from shared import instrument, require_auth, execute_query, success_response, error_response
+from shared.cache import TTLCache
+from shared.responses import compress_response
+
+# Dashboards are polled; a few seconds of staleness saves a query per poll
+CLASS_STATS_CACHE_TTL = float(os.environ.get('CLASS_STATS_CACHE_TTL', '30'))
+class_stats_cache = TTLCache(CLASS_STATS_CACHE_TTL)
+
+PERIODS = {
+    'all': None,
+    'week': timedelta(days=7),
+    'month': timedelta(days=30),
+}
+
+SORT_COLUMNS = {
+    'name': 'LOWER(COALESCE("firstName", \'\') || \' \' || COALESCE("lastName", \'\'))',
+    'accuracy': 'accuracy',
+    'points': '"totalPoints"',
+    'sessions': 'sessions',
+    'lastPractice': '"lastPracticeDate"',
+}
+
+CLASS_STATS_SQL = """
+    SELECT * FROM (
+        SELECT u.id, u."firstName", u."lastName", u."yearLevel", u."totalPoints",
+               u."currentStreak", u."lastPracticeDate", u."mathsDifficulty", u."englishDifficulty",
+               COALESCE(CASE WHEN %(since)s::timestamp IS NULL THEN st.attempts ELSE wk.attempts END, 0) AS attempts,
+               COALESCE(CASE WHEN %(since)s::timestamp IS NULL THEN st.correct ELSE wk.correct END, 0) AS correct,
+               COALESCE(CASE WHEN %(since)s::timestamp IS NULL THEN st.sessions ELSE wk.sessions END, 0) AS sessions,
+               st."rollingAccuracy"
+        FROM "studentLinks" l
+        JOIN users u ON u.id = l."studentId"
+        LEFT JOIN LATERAL (
+            SELECT SUM(s.attempts)::INTEGER AS attempts,
+                   SUM(s.correct)::INTEGER AS correct,
+                   SUM(s.sessions)::INTEGER AS sessions,
+                   ROUND(AVG(s."rollingAccuracy"))::INTEGER AS "rollingAccuracy"
+            FROM "userSubjectStats" s
+            WHERE s."userId" = u.id
+              AND (%(subject)s::varchar IS NULL OR s.subject = %(subject)s)
+        ) st ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT SUM(ps."questionsAttempted")::INTEGER AS attempts,
+                   SUM(ps."questionsCorrect")::INTEGER AS correct,
+                   COUNT(ps."completedAt")::INTEGER AS sessions
+            FROM "practiceSessions" ps
+            WHERE %(since)s::timestamp IS NOT NULL
+              AND ps."userId" = u.id
+              AND ps."startedAt" >= %(since)s
+              AND (%(subject)s::varchar IS NULL OR ps.subject = %(subject)s)
+        ) wk ON TRUE
+        WHERE l."supervisorId" = %(supervisor_id)s AND l.status = 'approved'
+    ) students
+    CROSS JOIN LATERAL (
+        SELECT CASE WHEN students.attempts > 0
+                    THEN ROUND(100.0 * students.correct / students.attempts)::INTEGER END AS accuracy
+    ) a
+    WHERE (%(max_accuracy)s::integer IS NULL OR a.accuracy < %(max_accuracy)s)
+      AND (%(min_accuracy)s::integer IS NULL OR a.accuracy >= %(min_accuracy)s)
+    ORDER BY {sort} {direction} NULLS LAST, id
+"""
+
+
+def _parse_accuracy(value, name):
+    if value in (None, ''):
+        return None
+    try:
+        accuracy = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}. Must be between 0 and 100")
+    if not (0 <= accuracy <= 100):
+        raise ValueError(f"Invalid {name}. Must be between 0 and 100")
+    return accuracy
+
+
+@instrument
+@compress_response
+@require_auth
+def lambda_handler(event, context, user):
+    """
+    Get stats for all students with an approved link to the caller
+    
+    Query parameters (all optional):
+        subject: 'maths' or 'english' (default: both)
+        period: 'all' | 'week' | 'month' (default 'all')
+        maxAccuracy: Only students below this accuracy (0-100) for the period
+        minAccuracy: Only students at or above this accuracy (0-100)
+        sort: 'name' | 'accuracy' | 'points' | 'sessions' | 'lastPractice' (default 'name')
+        order: 'asc' | 'desc' (default 'asc')
+        
+    Returns:
+        {"students": [...], "count": n}
+    """
+    try:
+        supervisor_id = user['sub']
+        params = event.get('queryStringParameters') or {}
+        
+        subject = params.get('subject') or None
+        period = params.get('period') or 'all'
+        sort = params.get('sort') or 'name'
+        order = (params.get('order') or 'asc').lower()
+        
+        if subject and subject not in ['maths', 'english']:
+            return error_response("Invalid subject. Must be 'maths' or 'english'")
+        if period not in PERIODS:
+            return error_response(f"Invalid period. Must be one of: {', '.join(PERIODS)}")
+        if sort not in SORT_COLUMNS:
+            return error_response(f"Invalid sort. Must be one of: {', '.join(SORT_COLUMNS)}")
+        if order not in ['asc', 'desc']:
+            return error_response("Invalid order. Must be 'asc' or 'desc'")
+        
+        try:
+            max_accuracy = _parse_accuracy(params.get('maxAccuracy'), 'maxAccuracy')
+            min_accuracy = _parse_accuracy(params.get('minAccuracy'), 'minAccuracy')
+        except ValueError as e:
+            return error_response(str(e))
+        
+        cache_key = (supervisor_id, subject, period, max_accuracy, min_accuracy, sort, order)
+        students = class_stats_cache.get(cache_key)
+        
+        if students is None:
+            since = datetime.utcnow() - PERIODS[period] if PERIODS[period] else None
+            query = CLASS_STATS_SQL.format(sort=SORT_COLUMNS[sort], direction=order.upper())
+            students = execute_query(query, {
+                'supervisor_id': supervisor_id,
+                'subject': subject,
+                'since': since,
+                'max_accuracy': max_accuracy,
+                'min_accuracy': min_accuracy,
+            })
+            class_stats_cache.set(cache_key, students)
+        
+        return success_response({
+            "students": students,
+            "count": len(students)
+        })
+        
+    except Exception as e:
+        return error_response(str(e), 500)
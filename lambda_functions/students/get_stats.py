@@ -0,0 +1,58 @@
+"""
+Lambda function: Get a student's stats
+Equivalent to: GET /api/students/{studentId}/stats
+"""
+from shared import instrument, require_auth, success_response, error_response
+from shared.stats import get_student_stats, EMPTY_SUBJECT_STATS
+
+@instrument
+@require_auth
+def lambda_handler(event, context, user):
+    """
+    Get a student's profile, per-subject stats and recent sessions
+    
+    Stats come from the incrementally maintained "userSubjectStats" table,
+    so this is one indexed read however much history the student has.
+    
+    Path parameters:
+        studentId: The student's user ID
+        
+    Returns:
+        Student summary, maths/english stats and the 10 most recent sessions
+    """
+    try:
+        path_params = event.get('pathParameters') or {}
+        student_id = path_params.get('studentId')
+        
+        if not student_id:
+            return error_response("Missing studentId")
+        
+        row = get_student_stats(user['sub'], student_id)
+        
+        # Same response for unknown and unlinked students, so IDs can't be probed
+        if not row or not row['isAuthorized']:
+            return error_response("Access denied. You must be linked to this student to view their stats.", 403)
+        
+        subjects = row['subjects'] or {}
+        maths = dict(EMPTY_SUBJECT_STATS, **subjects.get('maths', {}))
+        maths['difficulty'] = row['mathsDifficulty']
+        english = dict(EMPTY_SUBJECT_STATS, **subjects.get('english', {}))
+        english['difficulty'] = row['englishDifficulty']
+        
+        return success_response({
+            "student": {
+                "id": row['id'],
+                "firstName": row['firstName'],
+                "lastName": row['lastName'],
+                "yearLevel": row['yearLevel'],
+                "totalPoints": row['totalPoints'],
+                "currentStreak": row['currentStreak'],
+                "longestStreak": row['longestStreak'],
+            },
+            "maths": maths,
+            "english": english,
+            "recentSessions": row['recentSessions'],
+        })
+        
+    except Exception as e:
+        return error_response(str(e), 500)
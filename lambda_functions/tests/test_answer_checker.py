@@ -0,0 +1,133 @@
+"""
+Tests for shared.answer_checker
+
+check_answer() must only decide when the answer is unambiguous: anything it
+cannot be sure of returns None so the LLM grades it.
+"""
+from fractions import Fraction
+
+import pytest
+
+from shared.answer_checker import check_answer, check_answer_degraded, normalize_text, parse_number
+
+
+def grade(*args):
+    result = check_answer(*args)
+    return None if result is None else result['isCorrect']
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("42", (Fraction(42), '')),
+    ("1,250", (Fraction(1250), '')),
+    ("-3.5", (Fraction(-7, 2), '')),
+    ("3/4", (Fraction(3, 4), '')),
+    ("1 1/2", (Fraction(3, 2), '')),
+    ("$12.50", (Fraction(25, 2), '')),
+    ("120 cm", (Fraction(120), 'cm')),
+    ("50%", (Fraction(50), '%')),
+    ("twelve", None),
+    ("1/0", None),
+])
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+@pytest.mark.parametrize("correct, answer", [
+    ("12", "12"),
+    ("0.5", "1/2"),
+    ("1.5", "1 1/2"),
+    ("1250", "1,250"),
+    ("12 cm", "12"),
+    ("12 cm", "12cm"),
+    ("50%", "50 %"),
+])
+def test_maths_numeric_equality_is_accepted(correct, answer):
+    assert grade(correct, answer, 'maths') is True
+
+
+@pytest.mark.parametrize("correct, answer", [
+    ("0.5", "50%"),
+    ("50%", "0.5"),
+    ("12", "13"),
+    ("12", "twelve"),
+    ("120 cm", "1.2 m"),
+])
+def test_maths_without_equality_goes_to_the_llm(correct, answer):
+    assert check_answer(correct, answer, 'maths') is None
+
+
+@pytest.mark.parametrize("correct, answer, question_type", [
+    ("She was upset since her puppy went missing", "Because she lost her dog", None),
+    ("She was upset since her puppy went missing", "Because she lost her dog", 'text'),
+    ("happy", "glad", None),
+    ("happy", "glad", 'text'),
+    ("beautiful", "beautful", None),
+    ("12", "13", 'word_problem'),
+])
+def test_free_text_is_never_rejected_locally(correct, answer, question_type):
+    assert check_answer(correct, answer, 'english', question_type) is None
+
+
+@pytest.mark.parametrize("question_type", [None, 'text', 'word_problem'])
+def test_exact_text_match_is_accepted(question_type):
+    assert grade("The Cat sat.", "the cat sat", 'english', question_type) is True
+
+
+def test_fill_blank():
+    assert grade("ran", "ran", 'english', 'fill_blank') is True
+    assert grade("ran", "Ran!", 'english', 'fill_blank') is True
+    assert grade("ran", "jumped", 'english', 'fill_blank') is False
+    # A misspelling may or may not count
+    assert check_answer("necessary", "neccessary", 'english', 'fill_blank') is None
+
+
+def test_multiple_choice():
+    options = ["cat", "dog", "bird"]
+    assert grade("dog", "Dog", 'english', 'multiple_choice', options) is True
+    assert grade("dog", "cat", 'english', 'multiple_choice', options) is False
+    # Not one of the choices, maybe a typed variant
+    assert check_answer("dog", "puppy", 'english', 'multiple_choice', options) is None
+
+
+def test_result_shape():
+    result = check_answer("12", "12", 'maths')
+    assert set(result) == {"isCorrect", "feedback", "explanation"}
+    assert result["explanation"] == "The correct answer is 12."
+
+
+@pytest.mark.parametrize("correct, answer, expected", [
+    ("0.5", "1/2", True),
+    ("0.5", "50%", False),
+    ("happy", "Happy.", True),
+    ("happy", "glad", False),
+])
+def test_degraded_accepts_only_exact_matches(correct, answer, expected):
+    result = check_answer_degraded(correct, answer)
+    assert result["isCorrect"] is expected
+    assert result["degraded"] is True
+
+
+@pytest.mark.parametrize("correct, answer, question_type", [
+    ("-5", "5", 'text'),
+    ("5", "-5", None),
+    ("50%", "50", 'text'),
+    ("50", "50%", None),
+    ("0.5", "05", 'text'),
+])
+def test_signs_decimal_points_and_percents_are_significant(correct, answer, question_type):
+    assert check_answer(correct, answer, 'maths', question_type) is None
+    assert check_answer_degraded(correct, answer)["isCorrect"] is False
+
+
+def test_multiple_choice_matches_the_raw_option():
+    options = ["-3", "3", "6", "-6"]
+    assert grade("-3", "3", 'maths', 'multiple_choice', options) is False
+    assert grade("-3", "-3", 'maths', 'multiple_choice', options) is True
+    assert grade("-6", "6", 'maths', 'multiple_choice', options) is False
+
+
+def test_normalize_text_keeps_number_punctuation():
+    assert normalize_text("-5") == "-5"
+    assert normalize_text("50%") == "50%"
+    assert normalize_text("It costs 2.50.") == "it costs 2.50"
+    assert normalize_text("well-known") == "well known"
@@ -0,0 +1,52 @@
+"""
+Tests for the handler decorators
+
+metrics.instrument names an invocation after handler.__module__ when there
+is no Lambda context, so every decorator under it must keep that name.
+"""
+import pytest
+
+from shared.answer_events import flush_answer_events
+from shared.auth import require_auth
+from shared.conditional import conditional_get
+from shared.database import with_invocation_connection
+from shared.responses import compress_response
+
+
+def lambda_handler(event, context, user):
+    return {"statusCode": 200, "body": "{}"}
+
+
+@pytest.mark.parametrize("decorator", [
+    require_auth,
+    compress_response,
+    flush_answer_events,
+    with_invocation_connection,
+    conditional_get("SELECT 1"),
+])
+def test_decorators_keep_the_handler_name(decorator):
+    wrapped = decorator(lambda_handler)
+    assert wrapped.__module__ == __name__
+    assert wrapped.__name__ == 'lambda_handler'
+    assert wrapped.__wrapped__ is lambda_handler
+
+
+def test_stacked_decorators_keep_the_handler_name():
+    wrapped = compress_response(require_auth(conditional_get("SELECT 1")(lambda_handler)))
+    assert wrapped.__module__ == __name__
+
+
+def test_version_is_not_cached_in_memory(monkeypatch):
+    import contextlib
+    import shared.conditional as conditional
+
+    versions = iter(["1", "2"])
+    monkeypatch.setattr(conditional, 'CACHE_URL', None)
+    monkeypatch.setattr(conditional, 'execute_one', lambda query, params: {"version": next(versions)})
+    monkeypatch.setattr(conditional, 'invocation_connection', contextlib.nullcontext)
+
+    handler = conditional_get("SELECT 1", resource='pet')(lambda_handler)
+    user = {"sub": "user-1"}
+    etag = handler({}, None, user)["headers"]["ETag"]
+    response = handler({"headers": {"If-None-Match": etag}}, None, user)
+    assert response["statusCode"] == 200